@@ -0,0 +1,108 @@
+#!/bin/bash
+
+set -e
+
+write_instructions(){
+echo
+echo "--------------------------------"
+echo "      BMDS Desktop Manager"
+echo "--------------------------------"
+echo
+echo "1) Start BMDS Desktop"
+echo "2) Update BMDS Desktop"
+echo "2p) Update BMDS Desktop (prerelease - EPA VPN required)"
+echo "3) Show diagnostic information"
+echo
+}
+
+pause(){
+read -n 1 -p "Press any key to continue..."
+}
+
+start(){
+"/root/.pyenv/versions/3.11.7/bin/python" -m bmds_ui
+write_instructions
+}
+
+update(){
+echo "Updating BMDS Desktop"
+echo "---------------------"
+"/root/.pyenv/versions/3.11.7/bin/python" -m ensurepip &> /dev/null
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip install -U -q pip
+echo
+echo Current version:
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip show bmds-ui pybmds
+echo
+echo "This may take a while, wait until you see \"Update complete!\""
+echo "Updating ..."
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip install -U -q bmds-ui
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip show bmds-ui pybmds
+echo
+echo "Update complete!"
+pause
+write_instructions
+}
+
+update_pre(){
+echo "Updating BMDS Desktop (prerelease - EPA VPN required)"
+echo "-----------------------------------------------------"
+echo
+"/root/.pyenv/versions/3.11.7/bin/python" -m ensurepip &> /dev/null
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip install -U -q pip
+echo
+echo "Current version:"
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip show bmds-ui pybmds
+echo
+echo "This may take a while, wait until you see \"Update complete!\""
+echo "Updating ..."
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip install -q -U bmds-ui --index-url https://gitlab.epa.gov/api/v4/projects/1508/packages/pypi/simple
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip show bmds-ui pybmds
+echo
+echo "Update complete!"
+pause
+write_instructions
+}
+
+diagnostic(){
+echo
+echo "Diagnostic Installation Information:"
+echo "------------------------------------"
+echo
+echo "Python Version:"
+"/root/.pyenv/versions/3.11.7/bin/python" --version -VV
+echo
+echo "Python Path:"
+echo "/root/.pyenv/versions/3.11.7/bin/python"
+echo
+
+echo "BMDS UI + pybmds Version:"
+"/root/.pyenv/versions/3.11.7/bin/python" -m pip show bmds-ui pybmds
+echo
+pause
+write_instructions
+}
+
+valid_input=0
+write_instructions
+while [ $valid_input -eq 0 ]; do
+    read -p "Enter a number above, or q to quit: " user_input
+    if [[ $user_input == "q" || $user_input == "Q" || $user_input == "quit"  || $user_input == "exit" ]]; then
+        valid_input=1
+    fi
+    if [[ $user_input == "help" ]]; then
+        write_instructions
+    fi
+    if [[ $user_input == "1" ]]; then
+        start
+    fi
+    if [[ $user_input == "2" ]]; then
+        update
+    fi
+    if [[ $user_input == "2p" ]]; then
+        update_pre
+    fi
+    if [[ $user_input == "3" ]]; then
+        diagnostic
+    fi
+done
+pause
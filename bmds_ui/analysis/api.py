@@ -1,5 +1,11 @@
+from importlib.util import find_spec
+from io import BytesIO
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.text import slugify
 from rest_framework import exceptions, mixins, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -11,12 +17,26 @@ from pybmds.datasets.transforms.rao_scott import RaoScott
 from ..common import renderers
 from ..common.renderers import BinaryFile
 from ..common.serializers import UnusedSerializer
-from ..common.task_cache import ReportStatus
 from ..common.utils import get_bool
 from ..common.validation import pydantic_validate
 from . import models, schema, serializers, validators
-from .reporting.cache import DocxReportCache, ExcelReportCache
-from .reporting.docx import add_update_url, build_polyk_docx, build_raoscott_docx
+from .cache import TransformCache
+from .reporting import excel, transforms
+from .reporting.cache import CollectionExportCache, DocxReportCache, ExcelReportCache
+from .reporting.docx import build_polyk_docx, build_raoscott_docx
+
+
+def site_uri(request) -> str:
+    return request.build_absolute_uri("/")[:-1]
+
+
+def docx_report_kwargs(request) -> dict:
+    return {
+        "uri": site_uri(request),
+        "dataset_format_long": get_bool(request.query_params.get("datasetFormatLong")),
+        "all_models": get_bool(request.query_params.get("allModels")),
+        "bmd_cdf_table": get_bool(request.query_params.get("bmdCdfTable")),
+    }
 
 
 class AnalysisViewset(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
@@ -29,6 +49,45 @@ class AnalysisViewset(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
         data = models.Analysis().default_input()
         return Response(data)
 
+    @action(detail=False, methods=("post",))
+    def batch(self, request, *args, **kwargs):
+        """
+        Validate inputs for multiple analyses; if all are valid, create and execute each.
+
+        Returns the id and edit key for each analysis, in the order of inputs. Available on
+        desktop, or to staff users.
+        """
+        if not (settings.IS_DESKTOP or request.user.is_staff):
+            raise exceptions.PermissionDenied()
+        try:
+            batch = pydantic_validate(request.data, schema.AnalysisBatchInput)
+        except ValidationError as err:
+            raise exceptions.ValidationError(err.message) from None
+
+        errors = {}
+        for index, data in enumerate(batch.items):
+            try:
+                validators.validate_input(data)
+            except ValidationError as err:
+                errors[str(index)] = err.message
+        if errors:
+            raise exceptions.ValidationError(errors)
+
+        analyses = models.Analysis.start_execute_many(batch.items, report_uri=site_uri(request))
+        return Response(
+            [
+                {
+                    "id": str(analysis.id),
+                    "editKey": analysis.password,
+                    "api_url": analysis.get_api_url(),
+                    "edit_url": analysis.get_edit_url(),
+                    "status_url": analysis.get_api_status_url(),
+                }
+                for analysis in analyses
+            ],
+            status=201,
+        )
+
     @action(
         detail=True,
         methods=("patch",),
@@ -55,8 +114,12 @@ class AnalysisViewset(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
         except ValidationError as err:
             raise exceptions.ValidationError(err.message) from None
 
-        instance.reset_execution()
-        instance.inputs = data
+        if instance.only_recommender_changed(data):
+            # update existing outputs; models don't need to be executed
+            instance.update_recommender(data["recommender"])
+        else:
+            instance.reset_execution(keep_outputs=True)
+            instance.inputs = data
         instance.save()
 
         serializer = self.get_serializer(instance)
@@ -66,6 +129,9 @@ class AnalysisViewset(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     def execute(self, request, *args, **kwargs):
         """
         Attempt to execute the model.
+
+        If `incremental` is true, only sessions whose inputs have changed since the previous
+        execution are executed; outputs for unchanged sessions are reused.
         """
         instance = self.get_object()
 
@@ -80,13 +146,33 @@ class AnalysisViewset(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
             return Response("Execution already started", status=400)
 
         # start analysis execution
-        instance.reset_execution()
-        instance.start_execute()
+        instance.reset_execution(keep_outputs=request.data.get("incremental") is True)
+        instance.start_execute(report_uri=site_uri(request))
 
         instance.refresh_from_db()
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+    @action(detail=True)
+    def status(self, request, *args, **kwargs):
+        """
+        Return execution state and progress; inputs and session outputs are not loaded.
+        """
+        # outputs only contain execution metadata; session outputs are stored separately
+        queryset = models.Analysis.objects.only(
+            "id",
+            "outputs",
+            "errors",
+            "started",
+            "ended",
+            "last_updated",
+            "sessions_complete",
+            "sessions_total",
+        )
+        instance = get_object_or_404(queryset, pk=kwargs["pk"])
+        serializer = serializers.AnalysisStatusSerializer(instance)
+        return Response(serializer.data)
+
     @action(detail=True, methods=("post",), url_path="select-model")
     def select_model(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -135,37 +221,62 @@ class AnalysisViewset(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
         """
         instance = self.get_object()
         cache = ExcelReportCache(analysis=instance)
-        response = cache.request_content()
-        if response.status is ReportStatus.COMPLETE:
-            cache.delete()  # destroy from cache; request is now complete
-            data = renderers.BinaryFile(data=response.content, filename=instance.slug)
-            return Response(data)
+        response = cache.request_file(instance.slug)
+        if isinstance(response, FileResponse):
+            return response
 
         return Response(response.model_dump(), content_type="application/json")
 
+    @action(detail=True, renderer_classes=(renderers.CsvRenderer, renderers.ParquetRenderer))
+    def table(self, request, *args, **kwargs):
+        """
+        Return a single output table as CSV (default) or parquet (`?format=parquet`)
+
+        Query parameters include `table` (summary, datasets, or parameters; default summary),
+        and `columns`, an optional comma-separated list of columns to include.
+        """
+        instance: models.Analysis = self.get_object()
+        file_format = request.accepted_renderer.format
+        if file_format == "parquet" and find_spec("pyarrow") is None:
+            raise exceptions.ValidationError("Parquet export requires the pyarrow package")
+        name = request.query_params.get("table", "summary")
+        columns = [c for c in request.query_params.get("columns", "").split(",") if c]
+        try:
+            df = instance.to_table(name, columns)
+        except ValueError as err:
+            raise exceptions.ValidationError(str(err)) from None
+        filename = f"{instance.slug}-{name}.{file_format}"
+        if file_format == "parquet":
+            f = BytesIO()
+            excel.write_parquet(df, f)
+            f.seek(0)
+            return FileResponse(
+                f,
+                as_attachment=True,
+                filename=filename,
+                content_type=renderers.ParquetRenderer.media_type,
+            )
+        response = StreamingHttpResponse(
+            excel.iter_csv(df), content_type=renderers.CsvRenderer.media_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
     @action(detail=True, renderer_classes=(renderers.DocxRenderer,))
     def word(self, request, *args, **kwargs):
         """
         Return Word report for the selected analysis
         """
         instance: models.Analysis = self.get_object()
-        uri = request.build_absolute_uri("/")[:-1]
-        kwargs = {
-            "dataset_format_long": get_bool(request.query_params.get("datasetFormatLong")),
-            "all_models": get_bool(request.query_params.get("allModels")),
-            "bmd_cdf_table": get_bool(request.query_params.get("bmdCdfTable")),
-        }
-        cache = DocxReportCache(analysis=instance, uri=uri, **kwargs)
-        response = cache.request_content()
-        if response.status is ReportStatus.COMPLETE:
-            cache.delete()  # destroy from cache; request is now complete
-            edit = instance.password == request.query_params.get("editKey", "")
-            data = (
-                add_update_url(instance, response.content, uri)
-                if edit and not settings.IS_DESKTOP
-                else response.content
-            )
-            return Response(renderers.BinaryFile(data=data, filename=instance.slug))
+        kwargs = docx_report_kwargs(request)
+        edit = instance.password == request.query_params.get("editKey", "")
+        if edit and not settings.IS_DESKTOP:
+            # editors receive a separately cached report with a link to update the analysis
+            kwargs["edit_url"] = True
+        cache = DocxReportCache(analysis=instance, **kwargs)
+        response = cache.request_file(instance.slug)
+        if isinstance(response, FileResponse):
+            return response
 
         return Response(response.model_dump(), content_type="application/json")
 
@@ -203,6 +314,51 @@ class AnalysisViewset(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
         return Response(serializer.data)
 
 
+class CollectionViewset(viewsets.GenericViewSet):
+    serializer_class = serializers.CollectionSerializer
+    queryset = models.Collection.objects.all()
+    schema = AutoSchema(operation_id_base="Collection")
+
+    @action(detail=True, renderer_classes=(renderers.ZipRenderer,))
+    def export(self, request, *args, **kwargs):
+        """
+        Return a ZIP archive of Excel and Word reports for all analyses in a collection, with a
+        summary CSV of all analyses. Word report options are the same as the analysis report.
+        """
+        if not (settings.IS_DESKTOP or request.user.is_staff):
+            raise exceptions.PermissionDenied()
+        instance: models.Collection = self.get_object()
+        cache = CollectionExportCache(instance, **docx_report_kwargs(request))
+        response = cache.request_file(slugify(instance.name) or f"collection-{instance.id}")
+        if isinstance(response, FileResponse):
+            return response
+
+        return Response(response.model_dump(), content_type="application/json")
+
+
+def run_batch(
+    request, model: type[schema.PolyKBatchInput | schema.RaoScottBatchInput]
+) -> list[PolyKAdjustment | RaoScott]:
+    # validate all datasets in a batch, and return results for each dataset
+    try:
+        batch = pydantic_validate(request.data, model)
+    except ValidationError as err:
+        raise exceptions.ValidationError(err.message) from None
+    return TransformCache.calculate_many(batch.items, nprocs=settings.TRANSFORM_BATCH_NPROCS)
+
+
+def batch_zip_response(
+    analyses: list[PolyKAdjustment | RaoScott], report: transforms.ReportType, name: str
+) -> FileResponse:
+    f = transforms.export_zip(analyses, report, name, nprocs=settings.TRANSFORM_BATCH_NPROCS)
+    return FileResponse(
+        f,
+        as_attachment=True,
+        filename=f"{name}.zip",
+        content_type=renderers.ZipRenderer.media_type,
+    )
+
+
 class PolyKViewset(viewsets.GenericViewSet):
     queryset = models.Analysis.objects.none()
     serializer_class = UnusedSerializer
@@ -213,7 +369,7 @@ class PolyKViewset(viewsets.GenericViewSet):
             settings = pydantic_validate(request.data, schema.PolyKInput)
         except ValidationError as err:
             raise exceptions.ValidationError(err.message) from None
-        return settings.calculate()
+        return TransformCache.calculate(settings)
 
     def create(self, request, *args, **kwargs):
         analysis = self._run_analysis(request)
@@ -230,6 +386,41 @@ class PolyKViewset(viewsets.GenericViewSet):
         data = BinaryFile(analysis.to_excel(), "polyk-adjustment")
         return Response(data)
 
+    @action(detail=False, methods=["POST"])
+    def batch(self, request, *args, **kwargs):
+        """
+        Run many adjustments; return combined tables with the index of each dataset.
+        """
+        analyses = run_batch(request, schema.PolyKBatchInput)
+        return Response(
+            {
+                "df": transforms.combine([a.adjusted_data for a in analyses]).to_dict(
+                    orient="list"
+                ),
+                "df2": transforms.combine([a.summary for a in analyses]).to_dict(orient="list"),
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="batch-excel",
+        renderer_classes=(renderers.ZipRenderer,),
+    )
+    def batch_excel(self, request, *args, **kwargs):
+        analyses = run_batch(request, schema.PolyKBatchInput)
+        return batch_zip_response(analyses, "excel", "polyk-adjustment")
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="batch-word",
+        renderer_classes=(renderers.ZipRenderer,),
+    )
+    def batch_word(self, request, *args, **kwargs):
+        analyses = run_batch(request, schema.PolyKBatchInput)
+        return batch_zip_response(analyses, "word", "polyk-adjustment")
+
     @action(detail=False, methods=["POST"], renderer_classes=(renderers.DocxRenderer,))
     def word(self, request, *args, **kwargs):
         analysis = self._run_analysis(request)
@@ -248,8 +439,7 @@ class RaoScottViewset(viewsets.GenericViewSet):
             settings = pydantic_validate(request.data, schema.RaoScottInput)
         except ValidationError as err:
             raise exceptions.ValidationError(err.message) from None
-        analysis = settings.calculate()
-        return analysis
+        return TransformCache.calculate(settings)
 
     def create(self, request, *args, **kwargs):
         analysis = self._run_analysis(request)
@@ -261,6 +451,34 @@ class RaoScottViewset(viewsets.GenericViewSet):
         data = BinaryFile(analysis.to_excel(), "rao-scott-transformation")
         return Response(data)
 
+    @action(detail=False, methods=["POST"])
+    def batch(self, request, *args, **kwargs):
+        """
+        Run many transformations; return a combined table with the index of each dataset.
+        """
+        analyses = run_batch(request, schema.RaoScottBatchInput)
+        return Response({"df": transforms.combine([a.df for a in analyses]).to_dict(orient="list")})
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="batch-excel",
+        renderer_classes=(renderers.ZipRenderer,),
+    )
+    def batch_excel(self, request, *args, **kwargs):
+        analyses = run_batch(request, schema.RaoScottBatchInput)
+        return batch_zip_response(analyses, "excel", "rao-scott-transformation")
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="batch-word",
+        renderer_classes=(renderers.ZipRenderer,),
+    )
+    def batch_word(self, request, *args, **kwargs):
+        analyses = run_batch(request, schema.RaoScottBatchInput)
+        return batch_zip_response(analyses, "word", "rao-scott-transformation")
+
     @action(detail=False, methods=["POST"], renderer_classes=(renderers.DocxRenderer,))
     def word(self, request, *args, **kwargs):
         analysis = self._run_analysis(request)
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from pybmds.constants import ModelClass
+from pybmds.datasets.transforms.polyk import PolyKAdjustment
+from pybmds.datasets.transforms.rao_scott import RaoScott
+from pybmds.utils import get_version
+
+from ..common.task_cache import ReportFileStore
+from ..common.utils import can_start_processes
+from .schema import AnalysisSessionSchema, PolyKInput, RaoScottInput
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(ReportFileStore):
+    """
+    A store of executed session results, saved in a `sessions` folder in the report storage
+    path. Least recently used results are removed when the total size of the store exceeds
+    `ANALYSIS_SESSION_CACHE_STORAGE_MAX_SIZE` bytes.
+    """
+
+    @property
+    def root(self) -> Path:
+        return super().root / "sessions"
+
+    @property
+    def max_size(self) -> int:
+        return settings.ANALYSIS_SESSION_CACHE_STORAGE_MAX_SIZE
+
+    def get(self, key: str) -> bytes | None:
+        """Return data for a key, or None if missing or unused for the cache timeout."""
+        path = self.path(key)
+        try:
+            if time.time() - path.stat().st_mtime > settings.ANALYSIS_SESSION_CACHE_TIMEOUT:
+                path.unlink(missing_ok=True)
+                return None
+            data = path.read_bytes()
+            os.utime(path)  # update modified time for least recently used eviction
+        except FileNotFoundError:
+            return None
+        return data
+
+
+class SessionCache:
+    """
+    A content-addressed cache of executed session results.
+
+    Results are keyed by a hash of all inputs used to execute a session, along with the pybmds and
+    bmdscore versions, so that unchanged sessions can be reused across executions and analyses.
+    Results are saved in a `SessionStore`, which removes least recently used results when its
+    total size exceeds `ANALYSIS_SESSION_CACHE_STORAGE_MAX_SIZE` bytes. Results unused for
+    `ANALYSIS_SESSION_CACHE_TIMEOUT` seconds are not returned, results larger than
+    `ANALYSIS_SESSION_CACHE_MAX_SIZE` bytes are not stored, and sessions with errors are never
+    cached.
+
+    Items are the arguments used to execute a session; (dataset_index, option_index) for most
+    analyses, or (option_index,) for multitumor analyses.
+    """
+
+    KEY_PREFIX = "session"
+    HITS_KEY = "session-cache-hits"
+    MISSES_KEY = "session-cache-misses"
+
+    def __init__(self, inputs: dict):
+        self.inputs = inputs
+        self.store = SessionStore()
+        version = get_version()
+        self.version = {"python": version.python, "dll": version.dll}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ANALYSIS_SESSION_CACHE_TIMEOUT > 0
+
+    def _content(self, item: tuple) -> dict:
+        inputs = self.inputs
+        content = {
+            "dataset_type": inputs["dataset_type"],
+            "models": inputs["models"],
+            "options": inputs["options"][item[-1]],
+            "recommender": inputs.get("recommender"),
+            "version": self.version,
+        }
+        if inputs["dataset_type"] == ModelClass.MULTI_TUMOR:
+            enabled = [i for i, opt in enumerate(inputs["dataset_options"]) if opt["enabled"]]
+            content["datasets"] = [inputs["datasets"][i] for i in enabled]
+            content["dataset_options"] = [inputs["dataset_options"][i] for i in enabled]
+        else:
+            content["dataset"] = inputs["datasets"][item[0]]
+            content["dataset_options"] = inputs["dataset_options"][item[0]]
+        return content
+
+    def key(self, item: tuple) -> str:
+        """Return the cache key for an item; the hash of its canonical inputs."""
+        data = json.dumps(self._content(item), sort_keys=True, separators=(",", ":"))
+        return f"{self.KEY_PREFIX}-{hashlib.sha256(data.encode()).hexdigest()}"
+
+    @classmethod
+    def dump(cls, result: AnalysisSessionSchema) -> dict:
+        """Return result data which can be reused for any item with the same key."""
+        return result.model_dump(exclude={"dataset_index", "option_index"})
+
+    @classmethod
+    def load(cls, item: tuple, data: dict) -> AnalysisSessionSchema:
+        """Return a result for an item from data returned by `dump`."""
+        return AnalysisSessionSchema(
+            **data, dataset_index=item[0] if len(item) == 2 else -1, option_index=item[-1]
+        )
+
+    def get_many(self, items: list[tuple]) -> dict[tuple, AnalysisSessionSchema]:
+        """Return cached results for items which exist in the cache.
+
+        Args:
+            items (list[tuple]): Items to fetch
+
+        Returns:
+            dict[tuple, AnalysisSessionSchema]: Cached results, re-indexed for each item
+        """
+        if not self.enabled or len(items) == 0:
+            return {}
+        keys = {self.key(item): item for item in items}
+        hits = {}
+        for key, item in keys.items():
+            if data := self.store.get(key):
+                hits[item] = self.load(item, json.loads(data))
+        self._increment(self.HITS_KEY, len(hits))
+        self._increment(self.MISSES_KEY, len(keys) - len(hits))
+        return hits
+
+    def set_many(self, results: dict[tuple, AnalysisSessionSchema]):
+        """Cache results which executed successfully.
+
+        Args:
+            results (dict[tuple, AnalysisSessionSchema]): Results for each item
+        """
+        if not self.enabled:
+            return
+        saved = False
+        for item, result in results.items():
+            if result.error:
+                continue
+            # use python's json encoder to preserve NaN and Infinity values
+            value = json.dumps(self.dump(result)).encode()
+            if len(value) <= settings.ANALYSIS_SESSION_CACHE_MAX_SIZE:
+                self.store.save(self.key(item), BytesIO(value), evict=False)
+                saved = True
+        if saved:
+            self.store.evict()
+
+    @classmethod
+    def _increment(cls, key: str, delta: int):
+        if delta > 0:
+            cache.add(key, 0, timeout=None)
+            cache.incr(key, delta)
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        """Return the number of cache hits and misses."""
+        data = cache.get_many([cls.HITS_KEY, cls.MISSES_KEY])
+        return {"hits": data.get(cls.HITS_KEY, 0), "misses": data.get(cls.MISSES_KEY, 0)}
+
+    @classmethod
+    def clear_stats(cls):
+        cache.delete_many([cls.HITS_KEY, cls.MISSES_KEY])
+
+
+class TransformCache:
+    """
+    A cache of dataset transform results, such as a poly-k adjustment or Rao-Scott
+    transformation, keyed by a hash of validated inputs.
+
+    Inputs are normalized during validation, so equivalent requests share a result; results
+    expire after `TRANSFORM_CACHE_TIMEOUT` seconds, and a timeout of 0 disables the cache.
+    """
+
+    KEY_PREFIX = "transform"
+
+    @classmethod
+    def key(cls, inputs: PolyKInput | RaoScottInput) -> str:
+        data = json.dumps([type(inputs).__name__, inputs.model_dump(mode="json")], sort_keys=True)
+        return f"{cls.KEY_PREFIX}-{hashlib.sha256(data.encode()).hexdigest()}"
+
+    @classmethod
+    def calculate(cls, inputs: PolyKInput | RaoScottInput) -> PolyKAdjustment | RaoScott:
+        """Return a cached result if one exists; otherwise calculate and cache the result."""
+        if settings.TRANSFORM_CACHE_TIMEOUT <= 0:
+            return inputs.calculate()
+        key = cls.key(inputs)
+        if (result := cache.get(key)) is None:
+            result = inputs.calculate()
+            cache.set(key, result, timeout=settings.TRANSFORM_CACHE_TIMEOUT)
+        return result
+
+    @classmethod
+    def calculate_many(
+        cls, inputs: list[PolyKInput | RaoScottInput], nprocs: int = 1
+    ) -> list[PolyKAdjustment | RaoScott]:
+        """Return results for each input, calculating results which are not cached.
+
+        Args:
+            inputs (list): Validated inputs
+            nprocs (int, default 1): The number of processes used to calculate results; if 1,
+                results are calculated sequentially in the current process. Results are also
+                calculated sequentially if the current process is daemonic or the pool cannot
+                start.
+
+        Returns:
+            list: Results, in the same order as inputs
+        """
+        enabled = settings.TRANSFORM_CACHE_TIMEOUT > 0
+        keys = [cls.key(item) for item in inputs]
+        results = cache.get_many(keys) if enabled else {}
+        # calculate each unique input which is not cached
+        missing = {}
+        for key, item in zip(keys, inputs, strict=True):
+            if key not in results:
+                missing.setdefault(key, item)
+        calculated = None
+        if nprocs > 1 and len(missing) > 1 and can_start_processes():
+            with ProcessPoolExecutor(max_workers=min(nprocs, len(missing))) as pool:
+                try:
+                    values = pool.map(_calculate, missing.values())
+                except Exception:
+                    # worker processes could not be started; calculate in the current process
+                    logger.warning(
+                        "Cannot start process pool; calculating sequentially", exc_info=True
+                    )
+                    pool.shutdown(cancel_futures=True)
+                else:
+                    calculated = dict(zip(missing, values, strict=True))
+        if calculated is None:
+            calculated = {key: item.calculate() for key, item in missing.items()}
+        if enabled and calculated:
+            cache.set_many(calculated, timeout=settings.TRANSFORM_CACHE_TIMEOUT)
+        results.update(calculated)
+        return [results[key] for key in keys]
+
+
+def _calculate(inputs: PolyKInput | RaoScottInput) -> PolyKAdjustment | RaoScott:
+    return inputs.calculate()
@@ -1,12 +1,18 @@
 import itertools
+import logging
+import traceback
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from copy import deepcopy
 from typing import NamedTuple, Self
 
 import pybmds
+from pybmds.batch import BatchBase, BatchSession, MultitumorBatch
 from pybmds.constants import DistType, ModelClass
 from pybmds.session import Session
 from pybmds.types.nested_dichotomous import IntralitterCorrelation, LitterSpecificCovariate
 
+from ..common.utils import can_start_processes
 from .schema import AnalysisSessionSchema
 from .transforms import (
     PriorEnum,
@@ -15,6 +21,8 @@ from .transforms import (
     remap_exponential,
 )
 
+logger = logging.getLogger(__name__)
+
 # excluded continuous models if distribution type is lognormal
 lognormal_enabled = {pybmds.Models.ExponentialM3, pybmds.Models.ExponentialM5}
 
@@ -230,3 +238,161 @@ AllSession = AnalysisSession | MultiTumorSession
 def deserialize(model_class: ModelClass, data: dict) -> AllSession:
     Runner = MultiTumorSession if model_class is ModelClass.MULTI_TUMOR else AnalysisSession
     return Runner.deserialize(data)
+
+
+def to_batch(model_class: ModelClass, sessions: Iterable[AllSession]) -> BatchBase:
+    # convert AnalysisSession or MultiTumorSession objects to a pybmds batch
+    if model_class is ModelClass.MULTI_TUMOR:
+        return MultitumorBatch(session.session for session in sessions)
+
+    items = []
+    for session in sessions:
+        if session.frequentist:
+            items.append(session.frequentist)
+        if session.bayesian:
+            items.append(session.bayesian)
+    return BatchSession(sessions=items)
+
+
+class LazySessions(Sequence):
+    """
+    A sequence of sessions, where each session is deserialized when first accessed.
+
+    Outputs are not copied before deserialization unless `copy` is True, which is required if
+    outputs may be mutated elsewhere. Deserialized sessions are retained for subsequent access
+    unless `retain` is False, in which case sessions can be streamed one at a time.
+    """
+
+    def __init__(
+        self,
+        model_class: ModelClass,
+        outputs: Sequence[dict],
+        copy: bool = False,
+        retain: bool = True,
+    ):
+        self.model_class = model_class
+        self.outputs = outputs
+        self.copy = copy
+        self.retain = retain
+        self._sessions: dict[int, AllSession] = {}
+
+    def __len__(self) -> int:
+        return len(self.outputs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if session := self._sessions.get(index):
+            return session
+        data = self.outputs[index]
+        session = deserialize(self.model_class, deepcopy(data) if self.copy else data)
+        if self.retain:
+            self._sessions[index] = session
+        return session
+
+    def __iter__(self) -> Iterator[AllSession]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+def try_run_session(inputs: dict, dataset_index: int, option_index: int) -> AnalysisSessionSchema:
+    try:
+        return AnalysisSession.run(inputs, dataset_index, option_index)
+    except Exception:
+        return AnalysisSessionSchema(
+            dataset_index=dataset_index, option_index=option_index, error=traceback.format_exc()
+        )
+
+
+def try_run_multitumor(inputs: dict, option_index: int) -> AnalysisSessionSchema:
+    try:
+        return MultiTumorSession.run(inputs, option_index)
+    except Exception:
+        return AnalysisSessionSchema(
+            dataset_index=-1, option_index=option_index, error=traceback.format_exc()
+        )
+
+
+# inputs for the current process pool worker; set once per worker instead of once per task
+_worker_inputs: dict = {}
+
+
+def _set_worker_inputs(inputs: dict):
+    global _worker_inputs
+    _worker_inputs = inputs
+
+
+def _run_worker(runner: Callable[..., AnalysisSessionSchema], args: tuple) -> AnalysisSessionSchema:
+    return runner(_worker_inputs, *args)
+
+
+def _execute_sequential(
+    runner: Callable[..., AnalysisSessionSchema],
+    inputs: dict,
+    items: list[tuple],
+    callback: Callable[[tuple, AnalysisSessionSchema], None] | None = None,
+) -> list[AnalysisSessionSchema]:
+    results = []
+    for item in items:
+        results.append(runner(inputs, *item))
+        if callback:
+            callback(item, results[-1])
+    return results
+
+
+def execute_sessions(
+    runner: Callable[..., AnalysisSessionSchema],
+    inputs: dict,
+    items: list[tuple],
+    nprocs: int = 1,
+    callback: Callable[[tuple, AnalysisSessionSchema], None] | None = None,
+) -> list[AnalysisSessionSchema]:
+    """Execute sessions, optionally using a process pool.
+
+    Args:
+        runner (Callable): The method which executes a session; called with inputs and an item
+        inputs (dict): Analysis inputs
+        items (list[tuple]): Arguments for each session, such as (dataset_index, option_index)
+        nprocs (int, default 1): The number of processes to use; if 1, sessions are executed
+            sequentially in the current process. Sessions are also executed sequentially if
+            the current process is daemonic or the pool cannot start.
+        callback (Callable, optional): Called with the item and result as each session completes
+
+    Returns:
+        list[AnalysisSessionSchema]: Results, in the same order as items
+    """
+    if nprocs <= 1 or len(items) <= 1 or not can_start_processes():
+        return _execute_sequential(runner, inputs, items, callback)
+
+    results_by_index: dict[int, AnalysisSessionSchema] = {}
+    pool = ProcessPoolExecutor(
+        max_workers=min(nprocs, len(items)),
+        initializer=_set_worker_inputs,
+        initargs=(inputs,),
+    )
+    with pool:
+        try:
+            futures = {pool.submit(_run_worker, runner, item): i for i, item in enumerate(items)}
+        except Exception:
+            # worker processes could not be started; execute in the current process instead
+            logger.warning("Cannot start process pool; executing sequentially", exc_info=True)
+            pool.shutdown(cancel_futures=True)
+            return _execute_sequential(runner, inputs, items, callback)
+        for future in as_completed(futures):
+            index = futures[future]
+            item = items[index]
+            try:
+                result = future.result()
+            except Exception:
+                # the worker process failed; runners catch all other exceptions
+                result = AnalysisSessionSchema(
+                    dataset_index=item[0] if len(item) == 2 else -1,
+                    option_index=item[-1],
+                    error=traceback.format_exc(),
+                )
+            results_by_index[index] = result
+            if callback:
+                callback(item, result)
+    return [results_by_index[i] for i in range(len(items))]
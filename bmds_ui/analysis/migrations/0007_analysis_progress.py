@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analysis", "0006_alter_collection_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysis",
+            name="sessions_complete",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="analysis",
+            name="sessions_total",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
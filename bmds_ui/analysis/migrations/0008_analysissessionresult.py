@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analysis", "0007_analysis_progress"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisSessionResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("dataset_index", models.IntegerField()),
+                ("option_index", models.PositiveIntegerField()),
+                ("output", models.JSONField()),
+                (
+                    "analysis",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="session_results",
+                        to="analysis.analysis",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("analysis_id", "dataset_index", "option_index"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("analysis", "dataset_index", "option_index"),
+                        name="unique_analysis_session",
+                    )
+                ],
+            },
+        ),
+    ]
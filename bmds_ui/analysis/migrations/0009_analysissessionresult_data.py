@@ -0,0 +1,48 @@
+from django.db import migrations
+
+CHUNK_SIZE = 100
+
+
+def split_outputs(apps, schema_editor):
+    # move session outputs from `Analysis.outputs["outputs"]` to one row per session
+    Analysis = apps.get_model("analysis", "Analysis")
+    AnalysisSessionResult = apps.get_model("analysis", "AnalysisSessionResult")
+    qs = Analysis.objects.filter(outputs__has_key="outputs")
+    while ids := list(qs.values_list("id", flat=True)[:CHUNK_SIZE]):
+        analyses = list(Analysis.objects.filter(id__in=ids).only("id", "outputs"))
+        results = []
+        for analysis in analyses:
+            for output in analysis.outputs.pop("outputs") or []:
+                # schema version 1.0 outputs store indexes in a metadata object
+                indexes = output.get("metadata", output)
+                results.append(
+                    AnalysisSessionResult(
+                        analysis_id=analysis.id,
+                        dataset_index=indexes["dataset_index"],
+                        option_index=indexes["option_index"],
+                        output=output,
+                    )
+                )
+        AnalysisSessionResult.objects.bulk_create(results, batch_size=CHUNK_SIZE)
+        Analysis.objects.bulk_update(analyses, ["outputs"], batch_size=CHUNK_SIZE)
+
+
+def combine_outputs(apps, schema_editor):
+    Analysis = apps.get_model("analysis", "Analysis")
+    AnalysisSessionResult = apps.get_model("analysis", "AnalysisSessionResult")
+    qs = Analysis.objects.filter(session_results__isnull=False).distinct().only("id", "outputs")
+    for analysis in qs.iterator(chunk_size=CHUNK_SIZE):
+        results = AnalysisSessionResult.objects.filter(analysis_id=analysis.id).order_by(
+            "dataset_index", "option_index"
+        )
+        analysis.outputs["outputs"] = list(results.values_list("output", flat=True))
+        analysis.save(update_fields=["outputs"])
+    AnalysisSessionResult.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [("analysis", "0008_analysissessionresult")]
+
+    operations = [
+        migrations.RunPython(split_outputs, reverse_code=combine_outputs),
+    ]
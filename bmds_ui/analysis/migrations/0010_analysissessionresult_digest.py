@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:35
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 100
+
+
+def set_digests(apps, schema_editor):
+    AnalysisSessionResult = apps.get_model("analysis", "AnalysisSessionResult")
+    qs = AnalysisSessionResult.objects.filter(digest="").order_by("id")
+    while results := list(qs[:CHUNK_SIZE]):
+        for result in results:
+            data = json.dumps(result.output, sort_keys=True)
+            result.digest = hashlib.sha256(data.encode()).hexdigest()
+        AnalysisSessionResult.objects.bulk_update(results, ["digest"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analysis", "0009_analysissessionresult_data"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysissessionresult",
+            name="digest",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(set_digests, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analysis", "0010_analysissessionresult_digest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysissessionresult",
+            name="inputs_key",
+            field=models.CharField(blank=True, max_length=80),
+        ),
+        migrations.AddField(
+            model_name="analysissessionresult",
+            name="stale",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,31 +1,36 @@
+import hashlib
+import json
 import logging
+import threading
 import traceback
 import uuid
-from copy import deepcopy
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from io import BytesIO
 
 import pandas as pd
 import reversion
+from celery import chord
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
-from django.db import DataError, models
+from django.db import DataError, models, transaction
 from django.db.models.functions import Lower
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils.timezone import now
 
 import pybmds
-from pybmds.batch import BatchBase, BatchSession, MultitumorBatch
+from pybmds.batch import BatchBase
 from pybmds.constants import ModelClass
 from pybmds.recommender.recommender import RecommenderSettings
 
 from .. import __version__
 from ..common.utils import random_string
-from . import constants, tasks, validators
-from .executor import AnalysisSession, MultiTumorSession, Session, deserialize
+from . import constants, executor, tasks, validators
+from .cache import SessionCache
+from .executor import AnalysisSession, LazySessions, Session, deserialize
 from .reporting import excel
 from .reporting.cache import DocxReportCache, ExcelReportCache
 from .schema import AnalysisOutput, AnalysisSessionSchema
@@ -43,7 +48,66 @@ def get_deletion_date(current_deletion_date: datetime | None = None) -> datetime
     return date
 
 
-@reversion.register()
+class SessionLRU:
+    """
+    A bounded, per-process LRU cache of deserialized analysis sessions.
+
+    Entries are keyed by (analysis id, last_updated), so any saved change to an analysis makes
+    its entry stale. The size of an entry is estimated from the length of its serialized
+    outputs, scaled by `size_factor` to account for outputs and deserialized sessions in
+    memory; least recently used entries are evicted when the total exceeds
+    `ANALYSIS_SESSION_LRU_MAX_SIZE` bytes. Cached sessions are shared and must not be modified.
+    """
+
+    # measured memory of outputs and deserialized sessions, relative to serialized length
+    size_factor = 6
+
+    def __init__(self):
+        self._entries: OrderedDict[uuid.UUID, tuple[datetime | None, LazySessions, int]] = (
+            OrderedDict()
+        )
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self) -> int:
+        return settings.ANALYSIS_SESSION_LRU_MAX_SIZE
+
+    def get(self, id_: uuid.UUID, last_updated: datetime | None) -> LazySessions | None:
+        with self._lock:
+            entry = self._entries.get(id_)
+            if entry is None or entry[0] != last_updated:
+                return None
+            self._entries.move_to_end(id_)
+            return entry[1]
+
+    def set(self, id_: uuid.UUID, last_updated: datetime | None, sessions: LazySessions) -> bool:
+        """Add sessions to the cache if within the memory budget; returns True if added."""
+        size = self.size_factor * sum(len(json.dumps(output)) for output in sessions.outputs)
+        if size > self.max_size:
+            return False
+        with self._lock:
+            self._remove(id_)
+            self._entries[id_] = (last_updated, sessions, size)
+            self._size += size
+            while self._size > self.max_size:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def _remove(self, id_: uuid.UUID):
+        if entry := self._entries.pop(id_, None):
+            self._size -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+session_lru = SessionLRU()
+
+
+@reversion.register(exclude=("sessions_complete", "sessions_total"))
 class Analysis(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     password = models.CharField(max_length=12, default=random_string, editable=False)
@@ -54,6 +118,8 @@ class Analysis(models.Model):
     last_updated = models.DateTimeField(null=True, auto_now=True)
     started = models.DateTimeField(null=True, blank=True)
     ended = models.DateTimeField(null=True, blank=True)
+    sessions_complete = models.PositiveIntegerField(default=0)
+    sessions_total = models.PositiveIntegerField(default=0)
     deletion_date = models.DateTimeField(null=True, blank=True, default=get_deletion_date)
     starred = models.BooleanField(default=False)
     collections = models.ManyToManyField("analysis.Collection", related_name="analyses", blank=True)
@@ -73,9 +139,6 @@ class Analysis(models.Model):
             self.reset_execution()
             self.errors = ["An error occurred saving content. Please contact the developers."]
             super().save(*args, **kwargs)
-        finally:
-            DocxReportCache(analysis=self).delete()
-            ExcelReportCache(analysis=self).delete()
 
     @property
     def slug(self) -> str:
@@ -126,6 +189,9 @@ class Analysis(models.Model):
     def get_collections_url(self):
         return reverse("api:analysis-collections", args=(str(self.id),))
 
+    def get_api_status_url(self):
+        return reverse("api:analysis-status", args=(str(self.id),))
+
     def inputs_valid(self) -> bool:
         try:
             validators.validate_input(self.inputs)
@@ -145,6 +211,10 @@ class Analysis(models.Model):
     def has_errors(self):
         return len(self.errors) > 0
 
+    @property
+    def progress(self) -> dict[str, int]:
+        return {"complete": self.sessions_complete, "total": self.sessions_total}
+
     @classmethod
     def delete_old_analyses(cls):
         qs = cls.objects.filter(deletion_date__lt=now())
@@ -166,32 +236,63 @@ class Analysis(models.Model):
     def model_class_label(self) -> str:
         return constants.model_types[self.inputs["dataset_type"]]
 
-    def get_session(self, index: int) -> Session:
+    def get_outputs(self) -> dict:
+        """Return execution outputs, including the output of each session executed."""
+        if not self.outputs:
+            return {}
+        outputs = self.session_results.values_list("output", flat=True)
+        return {**self.outputs, "outputs": list(outputs)}
+
+    def get_content_digest(self) -> str:
+        """Return a digest of inputs and outputs; it changes whenever reports may change."""
+        digests = list(self.session_results.values_list("digest", flat=True))
+        data = json.dumps([self.inputs, self.outputs, digests], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get_session(self, dataset_index: int, option_index: int) -> Session:
         if not self.is_finished or self.has_errors:
             raise ValueError("Session cannot be returned")
-        return deserialize(self.model_class, deepcopy(self.outputs["outputs"][index]))
+        if sessions := session_lru.get(self.id, self.last_updated):
+            for output, session in zip(sessions.outputs, sessions, strict=True):
+                if (output["dataset_index"], output["option_index"]) == (
+                    dataset_index,
+                    option_index,
+                ):
+                    return session
+        result = self.session_results.get(dataset_index=dataset_index, option_index=option_index)
+        return deserialize(self.model_class, result.output)
+
+    def get_sessions(self, copy: bool = False) -> LazySessions:
+        """Return sessions, deserialized when each session is first accessed.
+
+        Unless copied, sessions are shared with other callers in this process via `session_lru`
+        and are read-only; reports draw figures using views of each session (see
+        `use_figure_cache`). Sessions are added to `session_lru` if they fit within its memory
+        budget; otherwise sessions are deserialized each time they are accessed, so they can be
+        streamed.
 
-    def get_sessions(self) -> list[Session]:
+        Args:
+            copy (bool, default False): Copy outputs before deserializing; sessions are not
+                shared and can be modified.
+        """
         if not self.is_finished or self.has_errors:
             raise ValueError("Session cannot be returned")
-        return [
-            deserialize(self.model_class, output) for output in deepcopy(self.outputs["outputs"])
-        ]
+        sessions = session_lru.get(self.id, self.last_updated)
+        if sessions and not copy:
+            return sessions
+        if sessions:
+            outputs = list(sessions.outputs)
+        else:
+            outputs = list(self.session_results.values_list("output", flat=True))
+        if copy:
+            return LazySessions(self.model_class, outputs, copy=True)
+        sessions = LazySessions(self.model_class, outputs)
+        if session_lru.set(self.id, self.last_updated, sessions):
+            return sessions
+        return LazySessions(self.model_class, outputs, retain=False)
 
     def to_batch(self) -> BatchBase:
-        # convert list[AnalysisSession] to list[pybmds.Session]
-        items = []
-        sessions = self.get_sessions()
-
-        if self.model_class == ModelClass.MULTI_TUMOR:
-            return MultitumorBatch(session.session for session in sessions)
-
-        for session in sessions:
-            if session.frequentist:
-                items.append(session.frequentist)
-            if session.bayesian:
-                items.append(session.bayesian)
-        return BatchSession(sessions=items)
+        return executor.to_batch(self.model_class, self.get_sessions())
 
     def to_df(self) -> dict[str, pd.DataFrame]:
         # exit early if we don't have data for a report
@@ -203,23 +304,45 @@ class Analysis(models.Model):
                 ).to_frame(),
             }
 
-        sessions = self.get_sessions()
-
         if self.model_class == ModelClass.MULTI_TUMOR:
+            sessions = self.get_sessions()
             return {
                 "summary": excel.multitumor_summary_df(sessions),
                 "datasets": excel.multitumor_dataset_df(sessions),
                 "parameters": excel.multitumor_params_df(sessions),
             }
 
-        return {
-            "summary": excel.summary_df(sessions),
-            "datasets": excel.dataset_df(sessions),
-            "parameters": excel.params_df(sessions),
-        }
+        # sessions are streamed if they can't be kept in memory
+        return excel.analysis_dfs(self.get_sessions())
+
+    def to_table(self, name: str, columns: list[str] | None = None) -> pd.DataFrame:
+        """Return a single exported table, optionally with a subset of columns.
+
+        Args:
+            name (str): The table name; one of the tables returned by `to_df`
+            columns (list[str], optional): Columns to include, in order
+
+        Raises:
+            ValueError: If the analysis cannot be exported, or the table or columns are invalid
+        """
+        if not self.is_finished or self.has_errors:
+            raise ValueError("Analysis not finished or error occurred - cannot create export")
+        data = self.to_df()
+        if name not in data:
+            raise ValueError(f"Invalid table; must be one of: {', '.join(data)}")
+        df = data[name]
+        if columns:
+            if missing := [column for column in columns if column not in df.columns]:
+                raise ValueError(f"Invalid columns: {', '.join(missing)}")
+            df = df[columns]
+        return df
 
     def to_excel(self) -> BytesIO:
         f = BytesIO()
+        if self.is_finished and not self.has_errors and not self.is_multitumor:
+            # write sessions into a constant-memory workbook writer
+            excel.write_xlsx(self.get_sessions(), f)
+            return f
         with pd.ExcelWriter(f) as writer:
             data = self.to_df()
             for name, df in data.items():
@@ -229,19 +352,68 @@ class Analysis(models.Model):
     def update_selection(self, selection: validators.AnalysisSelectedSchema):
         """Given a new selection data schema; update outputs and save instance
 
+        Only the `selected` value of the matching session output is updated; the session is not
+        deserialized, and no other session outputs are loaded or written.
+
         Args:
             selection (validators.AnalysisSelectedSchema): The selection to update
         """
-        for idx, output in enumerate(self.outputs["outputs"]):
-            if (
-                output["dataset_index"] == selection.dataset_index
-                and output["option_index"] == selection.option_index
-            ):
-                session = self.get_session(idx)
-                session.frequentist.selected = selection.selected.deserialize(session)
-                self.outputs["outputs"][idx] = session.to_dict()
-                self.save()
-                break
+        result = self.session_results.filter(
+            dataset_index=selection.dataset_index, option_index=selection.option_index
+        ).first()
+        if result is None or result.output.get("frequentist") is None:
+            return
+        result.output["frequentist"]["selected"] = selection.selected.model_dump(by_alias=True)
+        result.digest = AnalysisSessionResult.get_digest(result.output)
+        result.save(update_fields=["output", "digest"])
+
+        # update timestamp without creating a new version
+        self.last_updated = now()
+        Analysis.objects.filter(id=self.id).update(last_updated=self.last_updated)
+
+    def only_recommender_changed(self, inputs: dict) -> bool:
+        """Check if new inputs differ from the current inputs only in recommender settings.
+
+        If so, existing outputs can be updated with `update_recommender` instead of executing.
+
+        Args:
+            inputs (dict): The new inputs
+        """
+        if not self.is_finished or self.has_errors or self.is_multitumor:
+            return False
+
+        def _exclude(d: dict) -> dict:
+            return {k: v for k, v in d.items() if k != "recommender"}
+
+        return _exclude(self.inputs) == _exclude(inputs) and "recommender" in inputs
+
+    def update_recommender(self, recommender: dict):
+        """Update recommender settings and recommend using existing model results.
+
+        Models are not executed; frequentist sessions are deserialized and the recommender is
+        re-run with new settings. Model selections are unchanged. Session inputs keys are
+        updated, so sessions can be reused in a later incremental execution.
+
+        Args:
+            recommender (dict): New recommender settings
+        """
+        recommender_settings = RecommenderSettings.model_validate(recommender)
+        inputs = {**self.inputs, "recommender": recommender}
+        session_cache = SessionCache(inputs)
+        results = list(self.session_results.all())
+        for result in results:
+            result.inputs_key = session_cache.key(self._output_item(result.output))
+            if result.output["frequentist"] is None:
+                continue
+            session = AnalysisSession.deserialize(result.output)
+            session.frequentist.recommendation_settings = recommender_settings
+            session.frequentist.recommender = None
+            if session.frequentist.recommendation_enabled:
+                session.frequentist.recommend()
+            result.output = session.to_dict()
+            result.digest = AnalysisSessionResult.get_digest(result.output)
+        AnalysisSessionResult.objects.bulk_update(results, ["output", "digest", "inputs_key"])
+        self.inputs = inputs
 
     def try_execute(self):
         try:
@@ -250,66 +422,209 @@ class Analysis(models.Model):
             err = traceback.format_exc()
             self.handle_execution_error(err)
 
+    def _log_error(self, response: AnalysisSessionSchema) -> AnalysisSessionSchema:
+        if response.error:
+            logger.error(f"{self.id}: {response}")
+        return response
+
+    def _increment_progress(self, n: int):
+        if n > 0:
+            Analysis.objects.filter(id=self.id).update(
+                sessions_complete=models.F("sessions_complete") + n
+            )
+
+    def _save_session_result(self, output: AnalysisSessionSchema):
+        # persist a session as it completes; results are replaced when execution is finished
+        data = output.model_dump(by_alias=True)
+        AnalysisSessionResult.objects.update_or_create(
+            analysis_id=self.id,
+            dataset_index=output.dataset_index,
+            option_index=output.option_index,
+            defaults={
+                "output": data,
+                "digest": AnalysisSessionResult.get_digest(data),
+                "inputs_key": SessionCache(self.inputs).key(self._output_item(data)),
+                "stale": False,
+            },
+        )
+
+    def _output_item(self, output: dict) -> tuple:
+        # the execution item for a session output; see `_execution_items`
+        if self.is_multitumor:
+            return (output["option_index"],)
+        return (output["dataset_index"], output["option_index"])
+
+    def _previous_outputs(self, keys: list[str]) -> dict[str, dict]:
+        # successful outputs kept from a previous execution, keyed by session inputs
+        rows = self.session_results.filter(stale=True, inputs_key__in=keys).values_list(
+            "inputs_key", "output"
+        )
+        return {
+            key: SessionCache.dump(AnalysisSessionSchema.model_validate(output))
+            for key, output in rows
+            if output["error"] is None
+        }
+
+    def _run_sessions(
+        self, runner, inputs: dict, items: list[tuple], save_progress: bool = False
+    ) -> list[AnalysisSessionSchema]:
+        # reuse previous outputs or cached results where available; execute the remainder
+        session_cache = SessionCache(inputs)
+        results = {}
+        previous = self._previous_outputs([session_cache.key(item) for item in items])
+        for item in items:
+            if data := previous.get(session_cache.key(item)):
+                results[item] = SessionCache.load(item, data)
+        results.update(session_cache.get_many([item for item in items if item not in results]))
+        pending = [item for item in items if item not in results]
+        self._increment_progress(len(results))
+
+        def on_complete(item: tuple, result: AnalysisSessionSchema):
+            if save_progress:
+                self._save_session_result(result)
+            self._increment_progress(1)
+
+        outputs = executor.execute_sessions(
+            runner,
+            inputs,
+            pending,
+            nprocs=settings.ANALYSIS_EXECUTION_NPROCS,
+            callback=on_complete,
+        )
+        executed = dict(zip(pending, outputs, strict=True))
+        session_cache.set_many(executed)
+        results.update(executed)
+        return [self._log_error(results[item]) for item in items]
+
     def try_run_session(
         self, inputs: dict, dataset_index: int, option_index: int
     ) -> AnalysisSessionSchema:
-        try:
-            return AnalysisSession.run(inputs, dataset_index, option_index)
-        except Exception:
-            response = AnalysisSessionSchema(
-                dataset_index=dataset_index, option_index=option_index, error=traceback.format_exc()
-            )
-            logger.error(f"{self.id}: {response}")
-            return response
+        return self._run_sessions(
+            executor.try_run_session, inputs, [(dataset_index, option_index)]
+        )[0]
 
     def try_run_multitumor(self, inputs: dict, option_index: int) -> AnalysisSessionSchema:
-        try:
-            return MultiTumorSession.run(inputs, option_index)
-        except Exception:
-            response = AnalysisSessionSchema(
-                dataset_index=-1, option_index=option_index, error=traceback.format_exc()
-            )
-            logger.error(f"{self.id}: {response}")
-            return response
+        return self._run_sessions(executor.try_run_multitumor, inputs, [(option_index,)])[0]
+
+    @property
+    def _report_uri_key(self) -> str:
+        return f"analysis-report-uri-{self.id}"
 
-    def start_execute(self):
+    def get_report_uri(self) -> str:
+        """Return the site URI captured when execution started, used in pregenerated reports."""
+        return cache.get(self._report_uri_key) or settings.WEBSITE_URI
+
+    def set_report_uri(self, uri: str | None):
+        if uri:
+            cache.set(self._report_uri_key, uri, timeout=settings.REPORT_CACHE_TIMEOUT)
+
+    def start_execute(self, report_uri: str | None = None):
+        """Start executing the analysis.
+
+        Args:
+            report_uri (str, optional): The site URI of the request which started execution;
+                written to reports created when execution finishes.
+        """
+        self.set_report_uri(report_uri)
         # update model to indicate execution scheduled
         self.started = now()
         self.ended = None
+        self.sessions_complete = 0
+        self.sessions_total = len(self._execution_items())
         self.save()
+        self._queue_execute()
+
+    @classmethod
+    def start_execute_many(
+        cls, inputs: list[dict], queue: bool = True, report_uri: str | None = None
+    ) -> list["Analysis"]:
+        """
+        Create analyses from validated inputs in a single query, and start executing each.
 
+        Args:
+            inputs (list[dict]): Validated inputs for each analysis
+            queue (bool, default True): Add each analysis to the execution queue; if False, the
+                caller is responsible for execution and calling `finish_execute`.
+            report_uri (str, optional): The site URI of the request which started execution
+        """
+        started = now()
+        analyses = [cls(inputs=data, started=started) for data in inputs]
+        for analysis in analyses:
+            analysis.sessions_total = len(analysis._execution_items())
+        with transaction.atomic():
+            cls.objects.bulk_create(analyses)
+        for analysis in analyses:
+            analysis.set_report_uri(report_uri)
+            if queue:
+                analysis._queue_execute()
+        return analyses
+
+    def _queue_execute(self):
         # add to analysis queue...
-        tasks.try_execute.delay(str(self.id))
+        if settings.ANALYSIS_EXECUTION_DISTRIBUTED:
+            self._start_distributed_execute()
+        else:
+            tasks.try_execute.delay(str(self.id))
+
+    def _start_distributed_execute(self):
+        # execute each session as a separate task; combine results when all are complete
+        id_ = str(self.id)
+        task = tasks.execute_multitumor if self.is_multitumor else tasks.execute_session
+        header = [task.s(id_, *item) for item in self._execution_items()]
+        callback = tasks.finish_execute.s(id_).on_error(tasks.handle_execution_error.si(id_))
+        chord(header)(callback)
+
+    def _execution_items(self) -> list[tuple]:
+        """
+        Return arguments for each session to execute; (option_index,) for multitumor analyses,
+        otherwise (dataset_index, option_index) for each enabled dataset.
+        """
+        if self.is_multitumor:
+            return [(option_index,) for option_index in range(len(self.inputs["options"]))]
 
-    def _execute_session(self) -> list[AnalysisSessionSchema]:
         # build combinations based on enabled datasets
         combinations = []
         for dataset_index in range(len(self.inputs["datasets"])):
             for option_index in range(len(self.inputs["options"])):
                 if self.inputs["dataset_options"][dataset_index]["enabled"]:
                     combinations.append((dataset_index, option_index))
+        return combinations
 
-        return [
-            self.try_run_session(self.inputs, dataset_index, option_index)
-            for dataset_index, option_index in combinations
-        ]
+    def stale_sessions(self) -> list[tuple]:
+        """
+        Return execution items whose inputs have changed since outputs were last kept, and
+        therefore will be executed in an incremental execution.
+        """
+        session_cache = SessionCache(self.inputs)
+        items = self._execution_items()
+        previous = self._previous_outputs([session_cache.key(item) for item in items])
+        return [item for item in items if session_cache.key(item) not in previous]
 
-    def _execute_multitumor(self) -> list[AnalysisSessionSchema]:
-        n_options = len(self.inputs["options"])
-        return [
-            self.try_run_multitumor(self.inputs, option_index) for option_index in range(n_options)
-        ]
+    @property
+    def is_multitumor(self) -> bool:
+        return self.inputs.get("dataset_type") == pybmds.constants.ModelClass.MULTI_TUMOR
 
     def _execute(self) -> list[AnalysisSessionSchema]:
-        is_multitumor = self.inputs.get("dataset_type") == pybmds.constants.ModelClass.MULTI_TUMOR
-        if is_multitumor:
-            return self._execute_multitumor()
-        return self._execute_session()
+        runner = executor.try_run_multitumor if self.is_multitumor else executor.try_run_session
+        return self._run_sessions(runner, self.inputs, self._execution_items(), save_progress=True)
 
     def execute(self):
         # update start time to actual time started
         self.started = now()
+        self.sessions_complete = 0
+        self.sessions_total = len(self._execution_items())
+        Analysis.objects.filter(id=self.id).update(
+            started=self.started, sessions_complete=0, sessions_total=self.sessions_total
+        )
         outputs = self._execute()
+        self.finish_execute(outputs)
+
+    def finish_execute(self, outputs: list[AnalysisSessionSchema]):
+        """Save execution outputs and mark execution as complete.
+
+        Args:
+            outputs (list[AnalysisSessionSchema]): Outputs for each session executed
+        """
         # get bmds version
         bmds_python_version = None
         for output in outputs:
@@ -326,19 +641,64 @@ class Analysis(models.Model):
             bmds_python_version=bmds_python_version,
             outputs=[output.model_dump(by_alias=True) for output in outputs],
         )
-        self.outputs = analysis_output.model_dump(by_alias=True)
+        self.outputs = analysis_output.model_dump(by_alias=True, exclude={"outputs"})
         self.errors = [output.error for output in outputs if output.error]
+        self.sessions_complete = len(outputs)
         self.ended = now()
         self.deletion_date = get_deletion_date()
-        self.save()
+        session_outputs = analysis_output.model_dump(by_alias=True)["outputs"]
+        session_cache = SessionCache(self.inputs)
+        with transaction.atomic():
+            self.session_results.all().delete()
+            AnalysisSessionResult.objects.bulk_create(
+                AnalysisSessionResult(
+                    analysis=self,
+                    dataset_index=output["dataset_index"],
+                    option_index=output["option_index"],
+                    output=output,
+                    digest=AnalysisSessionResult.get_digest(output),
+                    inputs_key=session_cache.key(self._output_item(output)),
+                )
+                for output in session_outputs
+            )
+            self.save()
+
+        if settings.ANALYSIS_PREGENERATE_REPORTS and self.is_finished and not self.has_errors:
+            self.pregenerate_reports(session_outputs)
 
-    def reset_execution(self):
+    def pregenerate_reports(self, outputs: list[dict] | None = None):
+        """Request the Excel report and a Word report with default options.
+
+        Args:
+            outputs (list[dict], optional): Session outputs which were just saved; if provided,
+                sessions are added to `session_lru`. This only avoids loading outputs from the
+                database if reports are created in this process (eg., when tasks are eager).
+        """
+        if outputs is not None:
+            outputs = sorted(outputs, key=lambda d: (d["dataset_index"], d["option_index"]))
+            session_lru.set(self.id, self.last_updated, LazySessions(self.model_class, outputs))
+        ExcelReportCache(self).request_content()
+        DocxReportCache(self, **DocxReportCache.default_options(self)).request_content()
+
+    def reset_execution(self, keep_outputs: bool = False):
         """
         Update all modeling results and execution fields to a state where the analysis
         has not yet been executed.
+
+        Args:
+            keep_outputs (bool, default False): Keep successfully executed session outputs so
+                they can be reused in an incremental execution; outputs are kept as stale
+                session results, without copying them. Otherwise previous outputs are
+                discarded and all sessions will be executed.
         """
+        if keep_outputs:
+            self.session_results.update(stale=True)
+        else:
+            self.session_results.all().delete()
         self.started = None
         self.ended = None
+        self.sessions_complete = 0
+        self.sessions_total = 0
         self.outputs = {}
         self.errors = {}
 
@@ -378,6 +738,36 @@ class Analysis(models.Model):
         return self.last_updated or self.ended or self.created
 
 
+class AnalysisSessionResult(models.Model):
+    analysis = models.ForeignKey(Analysis, on_delete=models.CASCADE, related_name="session_results")
+    dataset_index = models.IntegerField()
+    option_index = models.PositiveIntegerField()
+    output = models.JSONField()
+    digest = models.CharField(max_length=64, blank=True)
+    # key of the session inputs used to execute; see `SessionCache.key`
+    inputs_key = models.CharField(max_length=80, blank=True)
+    # outputs kept after inputs changed, for reuse in an incremental execution
+    stale = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ("analysis_id", "dataset_index", "option_index")
+        constraints = (
+            models.UniqueConstraint(
+                fields=("analysis", "dataset_index", "option_index"),
+                name="unique_analysis_session",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.analysis_id}: {self.dataset_index}-{self.option_index}"
+
+    @classmethod
+    def get_digest(cls, output: dict) -> str:
+        """Return a hash of session output content."""
+        data = json.dumps(output, sort_keys=True)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+
 @reversion.register()
 class Collection(models.Model):
     name = models.CharField(max_length=128)
@@ -398,6 +788,12 @@ class Collection(models.Model):
     def opts(cls):
         return list(cls.objects.values("id", "name"))
 
+    def get_content_digest(self) -> str:
+        """Return a digest of the content of each analysis in the collection."""
+        analyses = self.analyses.only("id", "inputs", "outputs").order_by("id")
+        data = [[str(analysis.id), analysis.get_content_digest()] for analysis in analyses]
+        return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
 
 class ContentType(models.IntegerChoices):
     HOMEPAGE = 1
@@ -61,7 +61,8 @@ def successes() -> dict:
 
     # completions per week
     completed_filter = ExpressionWrapper(
-        Q(ended__isnull=False) & Q(outputs__outputs__isnull=False), output_field=BooleanField()
+        Q(ended__isnull=False) & Q(outputs__bmds_ui_version__isnull=False),
+        output_field=BooleanField(),
     )
     df = pd.DataFrame(
         data=Analysis.objects.annotate(completed=completed_filter)
@@ -84,7 +85,8 @@ def successes() -> dict:
     stats["fig_completions_per_week"] = fig
 
     completed_filter = ExpressionWrapper(
-        Q(ended__isnull=False) & Q(outputs__outputs__isnull=False), output_field=BooleanField()
+        Q(ended__isnull=False) & Q(outputs__bmds_ui_version__isnull=False),
+        output_field=BooleanField(),
     )
     df = pd.DataFrame(
         data=Analysis.objects.annotate(completed=completed_filter)
@@ -114,7 +116,8 @@ def datasets() -> dict:
 
     # dataset count by option set
     completed_filter = ExpressionWrapper(
-        Q(ended__isnull=False) & Q(outputs__outputs__isnull=False), output_field=BooleanField()
+        Q(ended__isnull=False) & Q(outputs__bmds_ui_version__isnull=False),
+        output_field=BooleanField(),
     )
     completed_qs = Analysis.objects.annotate(completed=completed_filter).filter(completed=True)
     mappings = Counter()
@@ -214,7 +217,7 @@ def get_analytics() -> dict:
     last_date = Analysis.objects.latest("created").created.date()
     n_days = (last_date - first_date).days + 1
     n_completed = Analysis.objects.filter(
-        ended__isnull=False, outputs__outputs__isnull=False
+        ended__isnull=False, outputs__bmds_ui_version__isnull=False
     ).count()
     return dict(
         first_date=first_date,
@@ -1,5 +1,16 @@
+import tempfile
+import zipfile
 from io import BytesIO
+from typing import BinaryIO
 
+import pandas as pd
+from celery import Signature, chord
+from django.conf import settings
+
+from pybmds.constants import ModelClass
+
+from ...common import background
+from ...common.renderers import DocxRenderer, XlsxRenderer, ZipRenderer
 from ...common.task_cache import ReportCache
 from .. import tasks
 from .docx import build_docx
@@ -7,9 +18,14 @@ from .docx import build_docx
 
 class ExcelReportCache(ReportCache):
     cache_prefix = "excel"
+    media_type = XlsxRenderer.media_type
+    extension = XlsxRenderer.format
 
-    def invoke_celery_task(self):
-        return tasks.generate_excel.delay(str(self.analysis.id))
+    def task_signature(self) -> Signature:
+        return tasks.generate_excel.si(str(self.analysis.id))
+
+    def invoke_celery_task(self, task_id: str):
+        return self.task_signature().apply_async(task_id=task_id)
 
     def create(self) -> BytesIO:
         return self.analysis.to_excel()
@@ -17,9 +33,105 @@ class ExcelReportCache(ReportCache):
 
 class DocxReportCache(ReportCache):
     cache_prefix = "docx"
+    media_type = DocxRenderer.media_type
+    extension = DocxRenderer.format
+
+    def __init__(self, analysis, **kw):
+        # the site URI is not written to desktop reports; ignore it so reports can be reused
+        if settings.IS_DESKTOP:
+            kw["uri"] = ""
+        super().__init__(analysis, **kw)
 
-    def invoke_celery_task(self):
-        return tasks.generate_report.delay(str(self.analysis.id), **self.kw)
+    @classmethod
+    def default_options(cls, analysis) -> dict:
+        # default report options in the analysis editor, as requested by an editor
+        options = {
+            "uri": analysis.get_report_uri(),
+            "dataset_format_long": analysis.model_class
+            not in (ModelClass.MULTI_TUMOR, ModelClass.NESTED_DICHOTOMOUS),
+            "all_models": False,
+            "bmd_cdf_table": False,
+        }
+        if not settings.IS_DESKTOP:
+            options["edit_url"] = True
+        return options
+
+    def task_signature(self) -> Signature:
+        return tasks.generate_report.si(str(self.analysis.id), **self.kw)
+
+    def invoke_celery_task(self, task_id: str):
+        return self.task_signature().apply_async(task_id=task_id)
 
     def create(self) -> BytesIO:
         return build_docx(self.analysis, **self.kw)
+
+
+class CollectionExportCache(ReportCache):
+    """
+    A ZIP archive with Excel and Word reports for each analysis in a collection, and a summary
+    CSV of all analyses. Keyword arguments are used for the Word reports.
+
+    Analysis reports are created in parallel tasks, and are shared with the report caches for
+    each analysis; the archive is assembled when all reports are complete. When tasks run in
+    background threads, a single task creates the reports and then assembles the archive.
+    """
+
+    cache_prefix = "collection"
+    media_type = ZipRenderer.media_type
+    extension = ZipRenderer.format
+
+    def __init__(self, collection, **kw):
+        super().__init__(collection, **kw)
+        self.collection = collection
+
+    def analyses(self):
+        return self.collection.analyses.order_by("created", "id")
+
+    def analysis_caches(self, analysis) -> list[ReportCache]:
+        return [ExcelReportCache(analysis), DocxReportCache(analysis, **self.kw)]
+
+    def invoke_celery_task(self, task_id: str):
+        callback = tasks.generate_collection_export.si(self.collection.id, **self.kw)
+        if background.is_enabled():
+            # an eager chord would run in the calling thread; missing reports are created
+            # when the archive is assembled
+            callback.apply_async(task_id=task_id)
+            return
+        header = [
+            cache.task_signature()
+            for analysis in self.analyses()
+            for cache in self.analysis_caches(analysis)
+            if not cache.is_complete()
+        ]
+        if header:
+            chord(header)(callback.set(task_id=task_id))
+        else:
+            callback.apply_async(task_id=task_id)
+
+    def _open_report(self, cache: ReportCache) -> BinaryIO:
+        # reports may have been removed from the store after they were created
+        try:
+            return cache.store.open(cache.cache_key)
+        except FileNotFoundError:
+            cache.create_content()
+            return cache.store.open(cache.cache_key)
+
+    def create(self) -> BinaryIO:
+        f = tempfile.TemporaryFile()
+        summaries = []
+        with zipfile.ZipFile(f, "w") as zf:
+            for analysis in self.analyses():
+                name = f"{analysis.slug}-{str(analysis.id)[:8]}"
+                for cache in self.analysis_caches(analysis):
+                    with (
+                        self._open_report(cache) as src,
+                        zf.open(f"{name}.{cache.extension}", "w") as dst,
+                    ):
+                        dst.write(src.read())
+                if (df := analysis.to_df().get("summary")) is not None:
+                    df.insert(0, "analysis_name", analysis.name())
+                    df.insert(0, "analysis_id", str(analysis.id))
+                    summaries.append(df)
+            summary = pd.concat(summaries, ignore_index=True) if summaries else pd.DataFrame()
+            zf.writestr("summary.csv", summary.to_csv(index=False), zipfile.ZIP_DEFLATED)
+        return f
@@ -1,21 +1,30 @@
 from __future__ import annotations
 
+import logging
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
+from itertools import repeat
 from typing import TYPE_CHECKING
 
 import docx
 from django.conf import settings
 from django.utils.timezone import now
 
+from pybmds.constants import ModelClass
 from pybmds.datasets.transforms.polyk import PolyKAdjustment
 from pybmds.datasets.transforms.rao_scott import RaoScott
 from pybmds.reporting.styling import Report, write_setting_p
 from pybmds.utils import get_version
 
 from ... import __version__ as bmds_ui_version
-from ...common.docx import add_url_hyperlink
-from ...common.utils import to_timestamp
+from ...common.docx import add_url_hyperlink, append_document
+from ...common.utils import can_start_processes, to_timestamp
+from ..executor import AllSession, deserialize, to_batch
 from ..utils import get_citation
+from .figures import use_figure_cache
+
+logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from ..models import Analysis
@@ -35,6 +44,7 @@ def build_docx(
     dataset_format_long: bool = True,
     all_models: bool = False,
     bmd_cdf_table: bool = False,
+    edit_url: bool = False,
 ) -> BytesIO:
     """Generate a Microsoft Word binary file for an analysis
 
@@ -44,6 +54,7 @@ def build_docx(
         dataset_format_long (bool, default True): long or wide dataset table format
         all_models (bool, default False):  Show all models, not just selected
         bmd_cdf_table (bool, default False): Export BMD CDF table
+        edit_url (bool, default False): Add a link to update the analysis; for editors only
 
     Returns:
         BytesIO: A word document byte stream
@@ -62,8 +73,10 @@ def build_docx(
     if not settings.IS_DESKTOP:
         p = report.document.add_paragraph()
         p.add_run(ANALYSIS_URL).bold = True
-        uri += analysis.get_absolute_url()
-        add_url_hyperlink(p, uri, "View")
+        add_url_hyperlink(p, uri + analysis.get_absolute_url(), "View")
+        if edit_url:
+            p.add_run(" / ")
+            add_url_hyperlink(p, uri + analysis.get_edit_url(), "Update")
 
     write_version_p(
         report,
@@ -77,9 +90,10 @@ def build_docx(
     elif analysis.has_errors:
         report.document.add_paragraph("Execution generated errors; no report can be generated")
     else:
-        batch = analysis.to_batch()
-        batch.to_docx(
-            report=report,
+        write_sessions(
+            report,
+            analysis,
+            nprocs=settings.REPORT_DOCX_NPROCS,
             header_level=1,
             citation=False,
             dataset_format_long=dataset_format_long,
@@ -94,6 +108,59 @@ def build_docx(
     return f
 
 
+def _write_batch(report: Report, model_class: ModelClass, sessions: Iterable[AllSession], kw: dict):
+    batch = to_batch(model_class, sessions)
+    # figures are drawn from views of each session; shared sessions are not modified
+    batch.sessions = [use_figure_cache(session) for session in batch.sessions]
+    batch.to_docx(report=report, **kw)
+
+
+def _session_docx(model_class: ModelClass, output: dict, kw: dict) -> bytes:
+    # render a single session in a new document; called in a worker process
+    report = Report.build_default()
+    _write_batch(report, model_class, [deserialize(model_class, output)], kw)
+    f = BytesIO()
+    report.document.save(f)
+    return f.getvalue()
+
+
+def write_sessions(report: Report, analysis: Analysis, nprocs: int = 1, **kw):
+    """Write each session in an analysis to a report.
+
+    If more than one process is used, each session is rendered as a separate document in a
+    process pool, and documents are appended to the report in session order. Sessions are
+    written in the current process if the current process is daemonic or a process pool cannot
+    be started. Sessions are shared with other callers via `session_lru`; figures are cached
+    using views of each session, so shared sessions are not modified.
+
+    Args:
+        report (Report): The report to write to
+        analysis (Analysis): An Analysis object
+        nprocs (int, default 1): The number of processes to use
+        **kw: Keyword arguments passed to the batch `to_docx` method
+    """
+    sessions = analysis.get_sessions()
+    if nprocs <= 1 or len(sessions) <= 1 or not can_start_processes():
+        _write_batch(report, analysis.model_class, sessions, kw)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(nprocs, len(sessions))) as pool:
+        try:
+            fragments = pool.map(
+                _session_docx, repeat(analysis.model_class), sessions.outputs, repeat(kw)
+            )
+        except Exception:
+            # worker processes could not be started; write in the current process instead
+            logger.warning(
+                "Cannot start process pool; writing sessions sequentially", exc_info=True
+            )
+            pool.shutdown(cancel_futures=True)
+            _write_batch(report, analysis.model_class, sessions, kw)
+            return
+        for data in fragments:
+            append_document(report.document, docx.Document(BytesIO(data)))
+
+
 def write_citation(report: Report, header_level: int):
     styles = report.styles
     header_style = styles.get_header_style(header_level)
@@ -105,30 +172,6 @@ def write_citation(report: Report, header_level: int):
     report.document.add_paragraph(get_citation(), styles.fixed_width)
 
 
-def add_update_url(analysis: Analysis, data: BytesIO, uri: str) -> BytesIO:
-    """Add an update URL to an existing BMDS report
-
-    Args:
-        analysis (Analysis): An Analysis object
-        data (BytesIO):  A word document byte stream
-        uri (str): The root URI for this site, eg: "https://example.com"
-
-    Returns:
-        BytesIO: A word document byte stream
-    """
-    document = docx.Document(data)
-    for p in document.paragraphs:
-        if p.text.startswith(ANALYSIS_URL):
-            p.add_run(" / ")
-            uri += analysis.get_edit_url()
-            add_url_hyperlink(p, uri, "Update")
-            break
-
-    f = BytesIO()
-    document.save(f)
-    return f
-
-
 def write_current_version_p(report):
     versions = get_version()
     write_version_p(report, bmds_ui_version, versions.python, versions.dll)
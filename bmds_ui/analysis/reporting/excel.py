@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from typing import Any
+import math
+import pickle
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import Any, BinaryIO
 
 import pandas as pd
+from openpyxl import Workbook
 
 from pybmds.constants import Dtype
 from pybmds.session import Session
@@ -48,98 +53,225 @@ def add_session(
         models.append(d)
 
 
-def summary_df(sessions: list[AnalysisSession]) -> pd.DataFrame:
-    dataset_data: dict[int, dict] = {}
-    model_data = []
+def _add_summary_rows(dataset_data: dict[int, dict], model_data: list, session: AnalysisSession):
+    if session.dataset_index not in dataset_data:
+        dataset = session.frequentist.dataset if session.frequentist else session.bayesian
+        d = dict(dataset_index=session.dataset_index)
+        dataset.update_record(d)
+        dataset_data[d["dataset_index"]] = d
 
-    for session in sessions:
-        if session.dataset_index not in dataset_data:
-            dataset = session.frequentist.dataset if session.frequentist else session.bayesian
-            d = dict(dataset_index=session.dataset_index)
-            dataset.update_record(d)
-            dataset_data[d["dataset_index"]] = d
-
-        if session.frequentist:
-            add_session(
-                model_data,
-                session.dataset_index,
-                session.option_index,
-                "frequentist",
-                session.frequentist,
-            )
-        if session.bayesian:
-            add_session(
-                model_data,
-                session.dataset_index,
-                session.option_index,
-                "bayesian",
-                session.bayesian,
-            )
+    if session.frequentist:
+        add_session(
+            model_data,
+            session.dataset_index,
+            session.option_index,
+            "frequentist",
+            session.frequentist,
+        )
+    if session.bayesian:
+        add_session(
+            model_data,
+            session.dataset_index,
+            session.option_index,
+            "bayesian",
+            session.bayesian,
+        )
 
+
+def _summary_df(dataset_data: dict[int, dict], model_data: list) -> pd.DataFrame:
     df1 = pd.DataFrame(dataset_data.values())
     df2 = pd.DataFrame(model_data)
     df3 = df1.merge(df2, on="dataset_index").fillna("-")
     return df3
 
 
-def params_df(sessions: list[AnalysisSession]) -> pd.DataFrame:
-    data = []
-    for session in sessions:
-        if session.frequentist:
-            for model_index, model in enumerate(session.frequentist.models):
-                if model.has_results:
-                    if session.frequentist.dataset.dtype == Dtype.NESTED_DICHOTOMOUS:
-                        data.extend(
-                            model.results.parameter_rows(
-                                extras=dict(
-                                    dataset_index=session.dataset_index,
-                                    option_index=session.option_index,
-                                    model_index=model_index,
-                                    model_name=model.name(),
-                                )
-                            )
-                        )
-                    else:
-                        data.extend(
-                            model.results.parameters.rows(
-                                extras=dict(
-                                    dataset_index=session.dataset_index,
-                                    option_index=session.option_index,
-                                    analysis_type="frequentist",
-                                    model_index=model_index,
-                                    model_name=model.name(),
-                                )
+def _add_params_rows(data: list, session: AnalysisSession):
+    if session.frequentist:
+        for model_index, model in enumerate(session.frequentist.models):
+            if model.has_results:
+                if session.frequentist.dataset.dtype == Dtype.NESTED_DICHOTOMOUS:
+                    data.extend(
+                        model.results.parameter_rows(
+                            extras=dict(
+                                dataset_index=session.dataset_index,
+                                option_index=session.option_index,
+                                model_index=model_index,
+                                model_name=model.name(),
                             )
                         )
-
-        if session.bayesian:
-            for model_index, model in enumerate(session.bayesian.models):
-                if model.has_results:
+                    )
+                else:
                     data.extend(
                         model.results.parameters.rows(
                             extras=dict(
                                 dataset_index=session.dataset_index,
                                 option_index=session.option_index,
-                                analysis_type="bayesian",
+                                analysis_type="frequentist",
                                 model_index=model_index,
                                 model_name=model.name(),
                             )
                         )
                     )
+
+    if session.bayesian:
+        for model_index, model in enumerate(session.bayesian.models):
+            if model.has_results:
+                data.extend(
+                    model.results.parameters.rows(
+                        extras=dict(
+                            dataset_index=session.dataset_index,
+                            option_index=session.option_index,
+                            analysis_type="bayesian",
+                            model_index=model_index,
+                            model_name=model.name(),
+                        )
+                    )
+                )
+
+
+def _add_dataset_rows(data: list, datasets: set, session: AnalysisSession):
+    if session.dataset_index not in datasets:
+        dataset = session.frequentist.dataset if session.frequentist else session.bayesian
+        datasets.add(session.dataset_index)
+        data.extend(dataset.rows(extras=dict(dataset_index=session.dataset_index)))
+
+
+def summary_df(sessions: Iterable[AnalysisSession]) -> pd.DataFrame:
+    dataset_data: dict[int, dict] = {}
+    model_data: list[dict] = []
+    for session in sessions:
+        _add_summary_rows(dataset_data, model_data, session)
+    return _summary_df(dataset_data, model_data)
+
+
+def params_df(sessions: Iterable[AnalysisSession]) -> pd.DataFrame:
+    data: list[dict] = []
+    for session in sessions:
+        _add_params_rows(data, session)
     return pd.DataFrame(data=data)
 
 
-def dataset_df(sessions: list[AnalysisSession]) -> pd.DataFrame:
+def dataset_df(sessions: Iterable[AnalysisSession]) -> pd.DataFrame:
     data: list[dict] = []
     datasets: set = set()
     for session in sessions:
-        if session.dataset_index not in datasets:
-            dataset = session.frequentist.dataset if session.frequentist else session.bayesian
-            datasets.add(session.dataset_index)
-            data.extend(dataset.rows(extras=dict(dataset_index=session.dataset_index)))
+        _add_dataset_rows(data, datasets, session)
     return pd.DataFrame(data=data)
 
 
+def analysis_dfs(sessions: Iterable[AnalysisSession]) -> dict[str, pd.DataFrame]:
+    """Return summary, dataset, and parameter dataframes in a single pass over sessions.
+
+    Sessions can be streamed; each session is only used while its rows are added.
+    """
+    dataset_data: dict[int, dict] = {}
+    model_data: list[dict] = []
+    dataset_rows: list[dict] = []
+    datasets: set = set()
+    params_rows: list[dict] = []
+    for session in sessions:
+        _add_summary_rows(dataset_data, model_data, session)
+        _add_dataset_rows(dataset_rows, datasets, session)
+        _add_params_rows(params_rows, session)
+    return {
+        "summary": _summary_df(dataset_data, model_data),
+        "datasets": pd.DataFrame(data=dataset_rows),
+        "parameters": pd.DataFrame(data=params_rows),
+    }
+
+
+class SheetSpool:
+    """
+    Rows for a worksheet, spooled to a temporary file while the columns are collected.
+
+    Columns are ordered by first appearance, as with a DataFrame built from a list of dicts.
+    """
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.columns: dict[str, None] = {}
+
+    def add(self, row: dict):
+        self.columns.update(dict.fromkeys(row))
+        pickle.dump(row, self.file)
+
+    def rows(self) -> Iterator[dict]:
+        self.file.seek(0)
+        while True:
+            try:
+                yield pickle.load(self.file)  # noqa: S301
+            except EOFError:
+                break
+
+    def close(self):
+        self.file.close()
+
+
+def _cell(value: Any, na: str | None = None) -> Any:
+    # convert a value to an excel cell value, consistent with `DataFrame.to_excel`
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return na
+    if isinstance(value, float) and math.isinf(value):
+        return "inf" if value > 0 else "-inf"
+    if isinstance(value, list | tuple | dict | set):
+        return str(value)
+    return value
+
+
+def write_xlsx(sessions: Iterable[AnalysisSession], f: BinaryIO):
+    """Write summary, dataset, and parameter worksheets in a single pass over sessions.
+
+    Rows are built from each session as it is read and written with a constant-memory
+    workbook writer, so sessions can be streamed and memory use does not grow with the number
+    of sessions. Contents are equivalent to `analysis_dfs`.
+    """
+    dataset_data: dict[int, dict] = {}
+    summary = SheetSpool()
+    model_columns: dict[str, None] = {}
+    dataset_rows, params_rows = SheetSpool(), SheetSpool()
+    datasets: set = set()
+    try:
+        for session in sessions:
+            model_data: list[dict] = []
+            _add_summary_rows(dataset_data, model_data, session)
+            for row in model_data:
+                model_columns.update(dict.fromkeys(row))
+                summary.add({**dataset_data[session.dataset_index], **row})
+
+            rows: list[dict] = []
+            _add_dataset_rows(rows, datasets, session)
+            for row in rows:
+                dataset_rows.add(row)
+
+            rows = []
+            _add_params_rows(rows, session)
+            for row in rows:
+                params_rows.add(row)
+
+        wb = Workbook(write_only=True)
+
+        # summary; equivalent to an inner join of dataset and model rows, with missing as "-"
+        dataset_columns = {k: None for d in dataset_data.values() for k in d}
+        columns = list(dataset_columns) + [c for c in model_columns if c not in dataset_columns]
+        ws = wb.create_sheet("summary")
+        ws.append(columns)
+        for row in summary.rows():
+            ws.append([_cell(row.get(column), na="-") for column in columns])
+
+        for name, spool in (("datasets", dataset_rows), ("parameters", params_rows)):
+            ws = wb.create_sheet(name)
+            columns = list(spool.columns)
+            if columns:
+                ws.append(columns)
+            for row in spool.rows():
+                ws.append([_cell(row.get(column)) for column in columns])
+
+        wb.save(f)
+    finally:
+        for spool in (summary, dataset_rows, params_rows):
+            spool.close()
+
+
 def multitumor_summary_df(sessions: list[MultiTumorSession]) -> pd.DataFrame:
     return pd.concat(
         [
@@ -162,3 +294,24 @@ def multitumor_dataset_df(sessions: list[MultiTumorSession]) -> pd.DataFrame:
     # if users run multiple option-sets, only print datasets first time
     first = sessions[0].session
     return first.datasets_df()
+
+
+def iter_csv(df: pd.DataFrame, chunk_size: int = 1000) -> Iterator[str]:
+    """Yield a dataframe as CSV text in chunks of rows, with a header in the first chunk."""
+    yield df.iloc[:0].to_csv(index=False)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start : start + chunk_size].to_csv(index=False, header=False)
+
+
+def write_parquet(df: pd.DataFrame, f: BinaryIO):
+    """Write a dataframe to parquet; requires the optional `pyarrow` package.
+
+    Object columns with mixed types (for example, numbers and "-" placeholders) are written as
+    strings, since parquet columns must have a single type.
+    """
+    df = df.copy()
+    for column in df.select_dtypes(include="object").columns:
+        values = df[column].dropna()
+        if values.map(type).nunique() > 1 or values.map(lambda v: isinstance(v, list | dict)).any():
+            df[column] = df[column].map(lambda v: v if v is None else str(v))
+    df.to_parquet(f, index=False)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+from collections.abc import Callable
+from copy import copy
+from functools import wraps
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from matplotlib.figure import Figure
+
+import pybmds
+from pybmds.plotting import close_figure
+
+from ...common.task_cache import ReportFileStore
+
+
+class FigureStore(ReportFileStore):
+    """
+    A content-addressed store of report figures, saved as PNG files in a `figures` folder in the
+    report storage path. Least recently used figures are removed when the total size of the
+    store exceeds `REPORT_FIGURE_CACHE_MAX_SIZE` bytes.
+    """
+
+    @property
+    def root(self) -> Path:
+        return super().root / "figures"
+
+    @property
+    def max_size(self) -> int:
+        return settings.REPORT_FIGURE_CACHE_MAX_SIZE
+
+
+class CachedFigure(Figure):
+    """
+    A figure which saves previously rendered content instead of drawing. It is only intended
+    for use with `pybmds.reporting.styling.add_mpl_figure`, which saves and closes figures.
+    """
+
+    def __init__(self, data: bytes):
+        super().__init__()
+        self.data = data
+
+    def savefig(self, fname, *args, **kwargs):
+        fname.write(self.data)
+
+
+def _cached_plot(store: FigureStore, key: str, method: Callable) -> Callable:
+    @wraps(method)
+    def plot(*args, **kwargs):
+        options = json.dumps([key, args, kwargs], sort_keys=True, default=str)
+        figure_key = hashlib.sha256(options.encode()).hexdigest()
+        if store.exists(figure_key):
+            try:
+                return CachedFigure(store.read(figure_key).getvalue())
+            except FileNotFoundError:
+                pass  # removed by another process
+        fig = method(*args, **kwargs)
+        f = BytesIO()
+        fig.savefig(f)
+        fig.clf()
+        close_figure(fig)
+        store.save(figure_key, f)
+        return CachedFigure(f.getvalue())
+
+    return plot
+
+
+def use_figure_cache(
+    session: pybmds.Session | pybmds.Multitumor,
+) -> pybmds.Session | pybmds.Multitumor:
+    """Return a view of a session which caches figures drawn in a report.
+
+    The session, its models, its model average, and its selected model are copied shallowly,
+    and plot methods of the copies are replaced with methods which return figures from a
+    `FigureStore` when available. Other attributes are shared with the session, which is not
+    modified, so sessions shared with other callers can be used. Figures are keyed by the
+    serialized session, the plotted object, and plot arguments.
+
+    Args:
+        session (pybmds.Session | pybmds.Multitumor): An executed session
+
+    Returns:
+        The session view, or the session if the figure cache is disabled
+    """
+    if settings.REPORT_FIGURE_CACHE_MAX_SIZE <= 0:
+        return session
+    store = FigureStore()
+    data = json.dumps([pybmds.__version__, session.to_dict()], sort_keys=True, default=str)
+    digest = hashlib.sha256(data.encode()).hexdigest()
+    view = copy(session)
+    view.models = [
+        [copy(model) for model in item] if isinstance(item, list) else copy(item)
+        for item in session.models
+    ]
+    if getattr(session, "model_average", None) is not None:
+        view.model_average = copy(session.model_average)
+    if getattr(session, "selected", None) is not None:
+        view.selected = copy(session.selected)
+        view.selected.session = view
+    models = [
+        model for item in view.models for model in (item if isinstance(item, list) else [item])
+    ]
+    targets = {"session": view, "model_average": getattr(view, "model_average", None)}
+    targets.update({f"model-{i}": model for i, model in enumerate(models)})
+    for name, target in targets.items():
+        for attr in ("plot", "cdf_plot"):
+            if target is not None and hasattr(target, attr):
+                key = f"{digest}-{name}-{attr}"
+                setattr(target, attr, _cached_plot(store, key, getattr(target, attr)))
+    return view
@@ -0,0 +1,72 @@
+import logging
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import repeat
+from typing import Literal
+
+import pandas as pd
+
+from pybmds.datasets.transforms.polyk import PolyKAdjustment
+from pybmds.datasets.transforms.rao_scott import RaoScott
+
+from ...common.utils import can_start_processes
+from .docx import build_polyk_docx, build_raoscott_docx
+
+logger = logging.getLogger(__name__)
+
+ReportType = Literal["excel", "word"]
+
+
+def combine(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """Combine a table from each result in a batch, adding the index of each result."""
+    return pd.concat(
+        [df.assign(index=i)[["index", *df.columns]] for i, df in enumerate(dfs)],
+        ignore_index=True,
+    )
+
+
+def _export(result: PolyKAdjustment | RaoScott, report: ReportType) -> bytes:
+    if report == "excel":
+        return result.to_excel().getvalue()
+    if isinstance(result, PolyKAdjustment):
+        return build_polyk_docx(result).getvalue()
+    return build_raoscott_docx(result).getvalue()
+
+
+def export_zip(
+    results: list[PolyKAdjustment | RaoScott], report: ReportType, name: str, nprocs: int = 1
+) -> BytesIO:
+    """Return a ZIP archive with an Excel or Word report for each result in a batch.
+
+    Args:
+        results (list): Results in a batch
+        report (ReportType): The report type
+        name (str): The name of each report; the index of the result is appended
+        nprocs (int, default 1): The number of processes used to create reports; if 1, reports
+            are created sequentially in the current process. Reports are also created
+            sequentially if the current process is daemonic or the pool cannot start.
+    """
+    extension = "xlsx" if report == "excel" else "docx"
+    if nprocs > 1 and len(results) > 1 and can_start_processes():
+        with ProcessPoolExecutor(max_workers=min(nprocs, len(results))) as pool:
+            try:
+                files = pool.map(_export, results, repeat(report))
+            except Exception:
+                # worker processes could not be started; create in the current process instead
+                logger.warning(
+                    "Cannot start process pool; creating reports sequentially", exc_info=True
+                )
+                pool.shutdown(cancel_futures=True)
+            else:
+                return _write_zip(files, name, extension)
+    return _write_zip((_export(result, report) for result in results), name, extension)
+
+
+def _write_zip(files, name: str, extension: str) -> BytesIO:
+    f = BytesIO()
+    with zipfile.ZipFile(f, "w") as zf:
+        for i, data in enumerate(files):
+            zf.writestr(f"{name}-{i}.{extension}", data)
+    f.seek(0)
+    return f
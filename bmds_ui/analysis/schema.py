@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from io import StringIO
 
 import pandas as pd
@@ -38,6 +39,12 @@ class AnalysisOutput(BaseModel):
     outputs: list[AnalysisSessionSchema]
 
 
+@lru_cache(maxsize=32)
+def read_dataset(value: str) -> pd.DataFrame:
+    """Parse a normalized CSV dataset; results are shared and must not be modified."""
+    return pd.read_csv(StringIO(value))
+
+
 class PolyKInput(BaseModel):
     dataset: str
     dose_units: str
@@ -54,7 +61,7 @@ class PolyKInput(BaseModel):
         value = re.sub(r"[,\t ]+", ",", value.strip())
 
         try:
-            df = pd.read_csv(StringIO(value))
+            df = read_dataset(value)
         except pd.errors.EmptyDataError:
             raise ValueError("Empty dataset") from None
 
@@ -75,7 +82,7 @@ class PolyKInput(BaseModel):
         return value
 
     def calculate(self) -> PolyKAdjustment:
-        input_df = pd.read_csv(StringIO(self.dataset)).sort_values(["dose", "day"])
+        input_df = read_dataset(self.dataset).sort_values(["dose", "day"])
         return PolyKAdjustment(
             doses=input_df.dose.tolist(),
             day=input_df.day.tolist(),
@@ -100,7 +107,7 @@ class RaoScottInput(BaseModel):
         value = re.sub(r"[,\t ]+", ",", value.strip())
 
         try:
-            df = pd.read_csv(StringIO(value))
+            df = read_dataset(value)
         except pd.errors.EmptyDataError:
             raise ValueError("Empty dataset") from None
 
@@ -124,7 +131,7 @@ class RaoScottInput(BaseModel):
         return value
 
     def calculate(self) -> RaoScott:
-        df = pd.read_csv(StringIO(self.dataset)).sort_values(["dose"])
+        df = read_dataset(self.dataset).sort_values(["dose"])
         dataset = DichotomousDataset(
             doses=df.dose.tolist(),
             ns=df.n.tolist(),
@@ -133,6 +140,18 @@ class RaoScottInput(BaseModel):
         return RaoScott(dataset=dataset, species=self.species)
 
 
+class PolyKBatchInput(BaseModel):
+    items: list[PolyKInput] = Field(min_length=1, max_length=100)
+
+
+class RaoScottBatchInput(BaseModel):
+    items: list[RaoScottInput] = Field(min_length=1, max_length=100)
+
+
+class AnalysisBatchInput(BaseModel):
+    items: list[dict] = Field(min_length=1, max_length=500)
+
+
 def add_schemas(schema: dict, models: list):
     for model in models:
         schema["components"]["schemas"][model.__name__] = model.model_json_schema(
@@ -14,6 +14,7 @@ class AnalysisSerializer(serializers.ModelSerializer):
     is_finished = serializers.BooleanField(read_only=True)
     has_errors = serializers.BooleanField(read_only=True)
     inputs_valid = serializers.BooleanField(read_only=True)
+    outputs = serializers.JSONField(source="get_outputs", read_only=True)
     collections = CollectionSerializer(many=True)
     api_url = serializers.URLField(source="get_api_url", read_only=True)
     excel_url = serializers.URLField(source="get_excel_url", read_only=True)
@@ -67,3 +68,24 @@ class AnalysisSerializer(serializers.ModelSerializer):
         except ValueError as err:
             raise serializers.ValidationError("Validation failed") from err
         return value
+
+
+class AnalysisStatusSerializer(serializers.ModelSerializer):
+    is_executing = serializers.BooleanField(read_only=True)
+    is_finished = serializers.BooleanField(read_only=True)
+    has_errors = serializers.BooleanField(read_only=True)
+    progress = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = models.Analysis
+        fields = (
+            "id",
+            "is_executing",
+            "is_finished",
+            "has_errors",
+            "progress",
+            "started",
+            "ended",
+            "last_updated",
+        )
+        read_only_fields = fields
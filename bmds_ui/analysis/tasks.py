@@ -2,12 +2,14 @@ from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.apps import apps
 
-from .reporting.cache import DocxReportCache, ExcelReportCache
+from ..common.background import BackgroundTask
+from .reporting.cache import CollectionExportCache, DocxReportCache, ExcelReportCache
+from .schema import AnalysisSessionSchema
 
 logger = get_task_logger(__name__)
 
 
-@shared_task()
+@shared_task(base=BackgroundTask)
 def try_execute(id_: str):
     analysis = apps.get_model("analysis", "Analysis").objects.get(id=id_)
     logger.info(f"starting execution: {analysis}")
@@ -15,23 +17,58 @@ def try_execute(id_: str):
     logger.info(f"finished execution: {analysis}")
 
 
+@shared_task()
+def execute_session(id_: str, dataset_index: int, option_index: int) -> dict:
+    analysis = apps.get_model("analysis", "Analysis").objects.only("id", "inputs").get(id=id_)
+    return analysis.try_run_session(analysis.inputs, dataset_index, option_index).model_dump()
+
+
+@shared_task()
+def execute_multitumor(id_: str, option_index: int) -> dict:
+    analysis = apps.get_model("analysis", "Analysis").objects.only("id", "inputs").get(id=id_)
+    return analysis.try_run_multitumor(analysis.inputs, option_index).model_dump()
+
+
+@shared_task()
+def finish_execute(results: list[dict], id_: str):
+    analysis = apps.get_model("analysis", "Analysis").objects.get(id=id_)
+    outputs = [AnalysisSessionSchema.model_validate(result) for result in results]
+    analysis.finish_execute(outputs)
+    logger.info(f"finished execution: {analysis}")
+
+
+@shared_task()
+def handle_execution_error(id_: str):
+    analysis = apps.get_model("analysis", "Analysis").objects.get(id=id_)
+    analysis.handle_execution_error("An error occurred during distributed execution.")
+    logger.error(f"failed execution: {analysis}")
+
+
 @shared_task()
 def delete_old_analyses():
     logger.info("Deleting old analyses")
     apps.get_model("analysis", "Analysis").delete_old_analyses()
 
 
-@shared_task()
-def generate_report(id_: str, **kw):
+@shared_task(base=BackgroundTask, bind=True)
+def generate_report(self, id_: str, **kw):
     logger.info(f"starting report generation: {id_}")
     analysis = apps.get_model("analysis", "Analysis").objects.get(id=id_)
-    DocxReportCache(analysis, **kw).create_content()
+    DocxReportCache(analysis, **kw).create_content(task_id=self.request.id)
     logger.info(f"finishing report generation: {id_}")
 
 
-@shared_task()
-def generate_excel(id_: str):
+@shared_task(base=BackgroundTask, bind=True)
+def generate_excel(self, id_: str):
     logger.info(f"starting excel generation: {id_}")
     analysis = apps.get_model("analysis", "Analysis").objects.get(id=id_)
-    ExcelReportCache(analysis).create_content()
+    ExcelReportCache(analysis).create_content(task_id=self.request.id)
     logger.info(f"finishing excel generation: {id_}")
+
+
+@shared_task(base=BackgroundTask, bind=True)
+def generate_collection_export(self, id_: int, **kw):
+    logger.info(f"starting collection export: {id_}")
+    collection = apps.get_model("analysis", "Collection").objects.get(id=id_)
+    CollectionExportCache(collection, **kw).create_content(task_id=self.request.id)
+    logger.info(f"finishing collection export: {id_}")
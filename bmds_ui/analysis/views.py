@@ -261,12 +261,17 @@ class AnalysisClone(RedirectView):
 
     def get_redirect_url(self, *args, **kwargs):
         analysis, _ = get_analysis_or_404(self.kwargs["pk"])
+        session_results = list(analysis.session_results.all())
         analysis.id = None
         analysis.inputs["analysis_name"] = analysis.inputs.get("analysis_name", "") + " (clone)"
         analysis.inputs["analysis_description"] = (
             analysis.inputs.get("analysis_description", "") + f" (cloned from {kwargs['pk']})"
         )
         analysis.save()
+        for result in session_results:
+            result.id = None
+            result.analysis = analysis
+        models.AnalysisSessionResult.objects.bulk_create(session_results)
         return analysis.get_edit_url()
 
 
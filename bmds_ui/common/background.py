@@ -0,0 +1,69 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from celery import Task, current_app
+from celery.utils import uuid
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared thread pool for background tasks, creating it if needed."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKGROUND_TASK_WORKERS, thread_name_prefix="background"
+            )
+        return _executor
+
+
+def is_enabled() -> bool:
+    """Return True if tasks with a `BackgroundTask` base run in background threads."""
+    return settings.BACKGROUND_TASK_WORKERS > 0 and current_app.conf.task_always_eager
+
+
+def _run(task: Task, args: tuple, kwargs: dict, task_id: str):
+    # each thread uses its own database connection; close it as a request would
+    close_old_connections()
+    try:
+        task.apply(args, kwargs, task_id=task_id, throw=True)
+    except Exception:
+        logger.exception(f"Background task failed: {task.name}[{task_id}]")
+    finally:
+        close_old_connections()
+
+
+def submit(
+    task: Task, args: tuple | None = None, kwargs: dict | None = None, task_id=None
+) -> Future:
+    """Run a task in a background thread of the current process."""
+    return get_executor().submit(_run, task, args or (), kwargs or {}, task_id or uuid())
+
+
+class BackgroundTask(Task):
+    """
+    A celery task which runs in a background thread when tasks are executed eagerly.
+
+    When `BACKGROUND_TASK_WORKERS` is greater than zero and celery is configured to execute tasks
+    eagerly (for example, BMDS Desktop), `apply_async` and `delay` add the task to a queue
+    which is processed by a pool of threads in the current process, instead of executing the
+    task in the calling thread. This allows the web server to keep handling requests while
+    tasks execute. Otherwise, tasks are sent to celery as usual.
+
+    Canvas primitives such as chords do not call `apply_async` when executed eagerly; check
+    `is_enabled` and submit a single task instead.
+    """
+
+    def apply_async(self, args=None, kwargs=None, task_id=None, **options):
+        if is_enabled():
+            task_id = task_id or uuid()
+            submit(self, args, kwargs, task_id)
+            return self.AsyncResult(task_id)
+        return super().apply_async(args, kwargs, task_id=task_id, **options)
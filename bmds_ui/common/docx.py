@@ -1,3 +1,6 @@
+from copy import deepcopy
+from io import BytesIO
+
 from docx.enum import dml
 from docx.opc import constants
 from docx.oxml.shared import OxmlElement, qn
@@ -36,3 +39,42 @@ def add_url_hyperlink(paragraph, url: str, text: str):
     # Delete this if using a template that has the hyperlink style in it
     run.font.color.theme_color = dml.MSO_THEME_COLOR_INDEX.HYPERLINK
     run.font.underline = True
+
+
+def append_document(target, source):
+    """Append the body of a docx document to another document.
+
+    Both documents are expected to use the same template, so styles are not copied. Images and
+    hyperlinks are added to the target document and relationship ids are updated.
+
+    Args:
+        target: a docx Document object to append to
+        source: a docx Document object to append
+    """
+    target_part, source_part = target.part, source.part
+    body = target.element.body
+    sect_pr = body.sectPr
+    drawing_ids = [int(el.get("id")) for el in body.iter(qn("wp:docPr"))]
+    next_drawing_id = max(drawing_ids, default=0) + 1
+    for element in source.element.body.iterchildren():
+        if element.tag == qn("w:sectPr"):
+            continue
+        element = deepcopy(element)
+        for blip in element.iter(qn("a:blip")):
+            image_part = source_part.related_parts[blip.get(qn("r:embed"))]
+            r_id, _ = target_part.get_or_add_image(BytesIO(image_part.blob))
+            blip.set(qn("r:embed"), r_id)
+        for hyperlink in element.iter(qn("w:hyperlink")):
+            if r_id := hyperlink.get(qn("r:id")):
+                url = source_part.rels[r_id].target_ref
+                hyperlink.set(
+                    qn("r:id"),
+                    target_part.relate_to(url, constants.RELATIONSHIP_TYPE.HYPERLINK, True),
+                )
+        for doc_pr in element.iter(qn("wp:docPr")):
+            doc_pr.set("id", str(next_drawing_id))
+            next_drawing_id += 1
+        if sect_pr is not None:
+            sect_pr.addprevious(element)
+        else:
+            body.append(element)
@@ -42,3 +42,30 @@ class DocxRenderer(BaseRenderer):
         response = renderer_context["response"]
         response["Content-Disposition"] = f'attachment; filename="{dataset.filename}.docx"'
         return dataset.data.getvalue()
+
+
+class CsvRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data: dict, media_type=None, renderer_context=None):
+        # successful responses are streamed; only errors are rendered
+        return json.dumps(data).encode()
+
+
+class ParquetRenderer(BaseRenderer):
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+
+    def render(self, data: dict, media_type=None, renderer_context=None):
+        # successful responses are streamed; only errors are rendered
+        return json.dumps(data).encode()
+
+
+class ZipRenderer(BaseRenderer):
+    media_type = "application/zip"
+    format = "zip"
+
+    def render(self, data: dict, media_type=None, renderer_context=None):
+        # successful responses are streamed; only errors are rendered
+        return json.dumps(data).encode()
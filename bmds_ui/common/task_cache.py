@@ -1,10 +1,92 @@
 import abc
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
 from enum import IntEnum
-from typing import Any
+from functools import cached_property
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO
+from uuid import uuid4
 
+from django.conf import settings
 from django.core.cache import cache
+from django.http import FileResponse
 from pydantic import BaseModel
 
+# reports use pyplot, which is not thread-safe; reports created in background threads of the
+# same process are created one at a time. Reentrant, as some reports create other reports.
+_create_lock = threading.RLock()
+
+
+class ReportFileStore:
+    """
+    A filesystem store for generated report files.
+
+    Files are written to `REPORT_STORAGE_PATH`, or a reports folder in `MEDIA_ROOT` if not set,
+    using a hash of the cache key as the filename. When the total size of stored files exceeds
+    `REPORT_STORAGE_MAX_SIZE` bytes, least recently used files are removed.
+    """
+
+    @property
+    def root(self) -> Path:
+        return Path(settings.REPORT_STORAGE_PATH or Path(settings.MEDIA_ROOT) / "reports")
+
+    @property
+    def max_size(self) -> int:
+        return settings.REPORT_STORAGE_MAX_SIZE
+
+    def path(self, key: str) -> Path:
+        return self.root / hashlib.sha256(key.encode()).hexdigest()
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def save(self, key: str, data: BinaryIO, evict: bool = True):
+        """Save data for a key, removing other files if the store exceeds its size limit.
+
+        If `evict` is False, the size limit is not checked; call `evict` after saving.
+        """
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        data.seek(0)
+        with tmp.open("wb") as f:
+            shutil.copyfileobj(data, f)
+        tmp.replace(path)
+        if evict:
+            self.evict(keep=path)
+
+    def open(self, key: str) -> BinaryIO:
+        """Open a stored file; raises FileNotFoundError if the file was removed."""
+        path = self.path(key)
+        os.utime(path)  # update modified time for least recently used eviction
+        return path.open("rb")
+
+    def read(self, key: str) -> BytesIO:
+        with self.open(key) as f:
+            return BytesIO(f.read())
+
+    def delete(self, key: str):
+        self.path(key).unlink(missing_ok=True)
+
+    def evict(self, keep: Path | None = None):
+        files = []
+        for path in self.root.iterdir():
+            if path.is_file() and path.suffix != ".tmp":
+                stat = path.stat()
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_size:
+                break
+            if path != keep:
+                path.unlink(missing_ok=True)
+                total -= size
+
 
 class ReportStatus(IntEnum):
     QUEUED = 1
@@ -16,86 +98,213 @@ class ReportResponse(BaseModel):
     content: Any | None = None
     header: str | None = None
     message: str | None = None
+    task_id: str | None = None
 
 
 class ReportCache(abc.ABC):
     """
     A cache designed for long-running report tasks.  The cache is designed for polling requests;
-    initially a QUEUED status will be created, followed by the actual result.  Results can be
-    cached for a long period, or could be discarded immediately after returning to a user.
+    initially a QUEUED status will be created, followed by the actual result.
+
+    Results are keyed by a digest of the analysis content and the report keyword arguments, so
+    a completed report is reused by all requests until the analysis content changes. When a
+    report is created for new content, the report for previous content is removed.
+
+    Report files are saved in a `ReportFileStore`; the cache only stores the report status.
+
+    Reports are usually created for an `Analysis`, but any object with an `id` and a
+    `get_content_digest` method can be used.
     """
 
     cache_prefix: str = ""  # should be unique for each subclass
+    media_type: str = ""
+    extension: str = ""
     status = ReportStatus
 
     def __init__(self, analysis, **kw):
         self.cache = cache
+        self.store = ReportFileStore()
         self.analysis = analysis
         self.kw = kw
 
-    @property
-    def cache_key(self):
-        return f"{self.cache_prefix}-{self.analysis.id}"
+    @cached_property
+    def options_key(self) -> str:
+        # unique for each analysis and set of report options
+        kw = json.dumps(self.kw, sort_keys=True, default=str)
+        return f"{self.cache_prefix}-{self.analysis.id}-{hashlib.sha256(kw.encode()).hexdigest()}"
+
+    @cached_property
+    def cache_key(self) -> str:
+        return f"{self.options_key}-{self.analysis.get_content_digest()}"
 
     def delete(self):
-        self.cache.delete(self.cache_key)
+        self.cache.delete_many([self.cache_key, self.options_key])
+        self.store.delete(self.cache_key)
+
+    def is_complete(self) -> bool:
+        """Return True if a report for the current content has been created."""
+        response = self.cache.get(self.cache_key)
+        return (
+            response is not None
+            and response.status is ReportStatus.COMPLETE
+            and self.store.exists(self.cache_key)
+        )
+
+    def read(self) -> BytesIO:
+        """Return the content of a completed report."""
+        return self.store.read(self.cache_key)
+
+    def file_response(self, filename: str) -> FileResponse | None:
+        """Return a streaming response of a completed report, or None if it was removed."""
+        try:
+            f = self.store.open(self.cache_key)
+        except FileNotFoundError:
+            return None
+        return FileResponse(
+            f,
+            as_attachment=True,
+            filename=f"{filename}.{self.extension}",
+            content_type=self.media_type,
+        )
+
+    def request_file(self, filename: str) -> FileResponse | ReportResponse:
+        """
+        Request the content; return a streaming response if complete, otherwise the current
+        status. To be called from an HTTP request lifecycle.
+
+        If the report file is removed after the content is found, a new task is started.
+        """
+        response = self.request_content()
+        if response.status is ReportStatus.COMPLETE:
+            if file := self.file_response(filename):
+                return file
+            response = self.request_content()
+        return response
 
     @abc.abstractmethod
-    def invoke_celery_task(self) -> None:
+    def invoke_celery_task(self, task_id: str) -> None:
         """
         Invoke celery task to invoke which does the work in the create method.
 
+        Args:
+            task_id (str): The id to use for the task; passed to `create_content`
+
         Returns None.
         """
         ...
 
     @abc.abstractmethod
-    def create(self) -> Any:
+    def create(self) -> BinaryIO:
         """
         The expensive method which does all the work.
 
         Returns:
-            Any: The content to be returned, and cached
+            BinaryIO: The content to be saved and returned
         """
         ...
 
+    @property
+    def lock_key(self) -> str:
+        return f"{self.cache_key}-lock"
+
+    def _queued_response(self, task_id: str | None) -> ReportResponse:
+        return ReportResponse(
+            status=ReportStatus.QUEUED,
+            content=None,
+            header="Report being created",
+            message="Report requested... please wait until results are complete.",
+            task_id=task_id,
+        )
+
     def request_content(self) -> ReportResponse:
         """
         Request the content if it exists; otherwise return teh current status and optionally kick
         off a task to create it. To be called from an HTTP request lifecycle.
 
+        Only one task is started for each report; the task holds a lock with a lease which is
+        renewed while the report is created. Requests made while the lock is held return the
+        id of the running task instead of starting a new one. If a task fails to renew its
+        lease, the next request starts a new task.
+
         Returns:
             ReportResponse:
         """
 
-        # try to get content from cache
+        # try to get content from cache; the report file may have been removed
         key = self.cache_key
         response = self.cache.get(key)
-        if response:
+        if response and response.status is ReportStatus.COMPLETE and self.store.exists(key):
             return response
 
-        # nothing done yet, request!
-        response = ReportResponse(
-            status=ReportStatus.QUEUED,
-            content=None,
-            header="Report being created",
-            message="Report requested... please wait until results are complete.",
-        )
-        self.cache.set(key, response, 60 * 10)  # save a queued status for up to 10 minutes
-        self.invoke_celery_task()
+        # attach to a running task, or start a new one if no task is running
+        task_id = str(uuid4())
+        if not self.cache.add(self.lock_key, task_id, timeout=settings.REPORT_LOCK_LEASE):
+            return self._queued_response(self.cache.get(self.lock_key))
+        response = self._queued_response(task_id)
+        self.invoke_celery_task(task_id)
         return response
 
-    def create_content(self) -> ReportResponse:
+    @contextmanager
+    def _heartbeat(self, task_id: str):
+        # renew the lock lease until the report is complete, then release the lock
+        lease = settings.REPORT_LOCK_LEASE
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(lease / 3):
+                if self.cache.get(self.lock_key) == task_id:
+                    self.cache.touch(self.lock_key, lease)
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+            if self.cache.get(self.lock_key) == task_id:
+                self.cache.delete(self.lock_key)
+
+    def create_content(self, task_id: str | None = None) -> ReportResponse:
         """
         Generate and cache the content.
+
+        Args:
+            task_id (str, optional): The id of the task creating content. If provided, the
+                report lock is held by this task until content is created; if the lock is held
+                by another task, content is not created and a queued status is returned.
         """
+        if task_id is None:
+            return self._create_content()
+
+        # claim the lock if its lease expired before this task started
+        owner = self.cache.get(self.lock_key)
+        if owner is None and self.cache.add(
+            self.lock_key, task_id, timeout=settings.REPORT_LOCK_LEASE
+        ):
+            owner = task_id
+        if owner != task_id:
+            return self._queued_response(owner)
+        with self._heartbeat(task_id):
+            return self._create_content()
+
+    def _create_content(self) -> ReportResponse:
         key = self.cache_key
-        content = self.create()
+        with _create_lock:
+            content = self.create()
+        self.store.save(key, content)
         response = ReportResponse(
             status=ReportStatus.COMPLETE,
-            content=content,
+            content=None,
             header=None,
             message=None,
         )
-        self.cache.set(key, response, timeout=60 * 60)  # save result for up 1 hour
+        self.cache.set(key, response, timeout=settings.REPORT_CACHE_TIMEOUT)
+
+        # remove report for previous content, if one exists
+        previous_key = self.cache.get(self.options_key)
+        if previous_key and previous_key != key:
+            self.cache.delete(previous_key)
+            self.store.delete(previous_key)
+        self.cache.set(self.options_key, key, timeout=settings.REPORT_CACHE_TIMEOUT)
         return response
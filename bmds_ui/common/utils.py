@@ -1,4 +1,5 @@
 import logging
+import multiprocessing
 import random
 import string
 from collections.abc import Callable
@@ -30,6 +31,17 @@ def get_bool(value: str | None) -> bool:
     return value is not None and value.lower() == "true"
 
 
+def can_start_processes() -> bool:
+    """Return True if the current process can start child processes for a process pool.
+
+    Daemonic processes started by the standard library `multiprocessing` module cannot start
+    child processes. Celery prefork workers are started by billiard and are not daemonic to the
+    standard library, so pools can start there; callers must still handle pools which fail to
+    start.
+    """
+    return not multiprocessing.current_process().daemon
+
+
 def timeout_cache(key: str, timeout: int) -> Callable:
     """Decorator to cache result key for N seconds
 
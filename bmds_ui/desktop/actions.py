@@ -50,8 +50,8 @@ def setup_django_environment(db: Database):
     public_data_root = app_home / "public" / version
     logs_path = app_home / "logs" / version
 
-    public_data_root.mkdir(exist_ok=True, parents=False)
-    logs_path.mkdir(exist_ok=True, parents=False)
+    public_data_root.mkdir(exist_ok=True, parents=True)
+    logs_path.mkdir(exist_ok=True, parents=True)
 
     desktop.PUBLIC_DATA_ROOT = public_data_root
     desktop.STATIC_ROOT = public_data_root / "static"
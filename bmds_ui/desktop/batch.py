@@ -0,0 +1,163 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from pydantic import ValidationError
+from rich.console import Console
+
+from .config import Database
+from .exceptions import DesktopException
+from .log import log, stream
+
+
+def find_input_files(paths: list[Path]) -> list[Path]:
+    """Return analysis input files; directories are expanded to the JSON files they contain."""
+    files = []
+    for path in paths:
+        path = path.expanduser().resolve()
+        if path.is_dir():
+            files.extend(sorted(path.glob("*.json")))
+        elif path.is_file():
+            files.append(path)
+        else:
+            raise DesktopException(f"Input not found: {path}")
+    if not files:
+        raise DesktopException("No input files found")
+    return files
+
+
+def _execute(inputs: dict, items: list[tuple], multitumor: bool) -> list:
+    # execute all sessions for an analysis; called in a process pool worker
+    from ..analysis import executor
+
+    runner = executor.try_run_multitumor if multitumor else executor.try_run_session
+    return [runner(inputs, *item) for item in items]
+
+
+def _output_names(files: list[Path]) -> list[str]:
+    # unique output filenames, based on input filenames
+    stems = {file.stem for file in files}
+    names: list[str] = []
+    for file in files:
+        name, suffix = file.stem, 1
+        while name in names or (name != file.stem and name in stems):
+            suffix += 1
+            name = f"{file.stem}-{suffix}"
+        names.append(name)
+    return names
+
+
+def write_outputs(analysis, path: Path, reports: bool = True):
+    """Write analysis inputs and outputs to JSON, and optionally Excel and Word reports.
+
+    Reports are only written for analyses executed without errors.
+    """
+    from ..analysis.reporting.cache import DocxReportCache, ExcelReportCache
+
+    data = {
+        "id": str(analysis.id),
+        "inputs": analysis.inputs,
+        "outputs": analysis.get_outputs(),
+        "errors": analysis.errors,
+    }
+    path.with_suffix(".json").write_text(json.dumps(data, indent=2))
+    if reports and not analysis.has_errors:
+        caches = [
+            ExcelReportCache(analysis),
+            DocxReportCache(analysis, **DocxReportCache.default_options(analysis)),
+        ]
+        for cache in caches:
+            path.with_suffix(f".{cache.extension}").write_bytes(cache.create().getvalue())
+
+
+def run_batch(files: list[Path], output: Path, nprocs: int = 1, reports: bool = True) -> list:
+    """Create and execute an analysis for each input file, and write outputs to a folder.
+
+    All inputs are validated before any analysis is created. Analyses are executed in a process
+    pool if `nprocs` is greater than one, and saved to the active database.
+
+    Args:
+        files (list[Path]): Analysis input JSON files
+        output (Path): Folder where outputs and reports are written
+        nprocs (int, default 1): The number of processes to use
+        reports (bool, default True): Write Excel and Word reports for each analysis
+
+    Returns:
+        list[Analysis]: Executed analyses, in the same order as files
+    """
+    # analysis modules are imported after the django environment is configured
+    from django.core.exceptions import ValidationError as DjangoValidationError
+
+    from ..analysis import validators
+    from ..analysis.models import Analysis
+
+    inputs = []
+    for file in files:
+        try:
+            data = json.loads(file.read_text())
+            validators.validate_input(data)
+        except ValueError as err:
+            raise DesktopException(f"Cannot parse {file}: {err}") from None
+        except DjangoValidationError as err:
+            raise DesktopException(f"Invalid inputs {file}:\n{err.message}") from None
+        inputs.append(data)
+
+    output.mkdir(parents=True, exist_ok=True)
+    analyses = Analysis.start_execute_many(inputs, queue=False)
+    args = (
+        [analysis.inputs for analysis in analyses],
+        [analysis._execution_items() for analysis in analyses],
+        [analysis.is_multitumor for analysis in analyses],
+    )
+    nprocs = min(nprocs, len(analyses))
+    with ProcessPoolExecutor(max_workers=nprocs) if nprocs > 1 else nullcontext() as pool:
+        results = pool.map(_execute, *args) if pool else map(_execute, *args)
+        for analysis, name, outputs in zip(analyses, _output_names(files), results, strict=True):
+            analysis.finish_execute(outputs)
+            write_outputs(analysis, output / name, reports=reports)
+            log.info(f"Executed {analysis.id}: {output / name}")
+    return analyses
+
+
+def batch(
+    inputs: list[Path],
+    output: Path,
+    db: Path | None = None,
+    nprocs: int = 1,
+    reports: bool = True,
+):
+    """Execute analyses from input files without starting the web application.
+
+    If a database is specified, analyses are saved to the database (which is created if it
+    doesn't exist); otherwise a temporary database is used, which is removed when complete.
+    """
+    from django.db import connections
+
+    from .actions import setup_django_environment
+
+    files = find_input_files(inputs)
+    with TemporaryDirectory() as tmp:
+        try:
+            database = Database(name="batch", path=db or Path(tmp) / "batch.sqlite3")
+        except ValidationError as err:
+            raise DesktopException(f"Invalid database: {db}") from err
+        os.environ["DJANGO_SETTINGS_MODULE"] = "bmds_ui.main.settings.desktop"
+        setup_django_environment(database)
+        try:
+            call_command("migrate", interactive=False, verbosity=0, stdout=stream, stderr=stream)
+            analyses = run_batch(files, output.expanduser().resolve(), nprocs, reports)
+        finally:
+            # close the database before a temporary database is removed
+            connections.close_all()
+
+    console = Console()
+    for file, analysis in zip(files, analyses, strict=True):
+        style = "red" if analysis.has_errors else "green"
+        status = "error" if analysis.has_errors else "complete"
+        console.print(f"{file.name}: {status} ({analysis.id})", style=style)
+    if any(analysis.has_errors for analysis in analyses):
+        raise DesktopException("One or more analyses have errors")
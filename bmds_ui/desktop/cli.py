@@ -6,16 +6,21 @@ from pathlib import Path
 from .. import __version__
 from .actions import create_shortcut, show_version
 from .app import BmdsDesktopTui
+from .batch import batch
 from .config import Config, get_default_config_path
 from .exceptions import DesktopException
 from .log import setup_logging
 
 
-def get_app(config: str | None = None) -> BmdsDesktopTui:
+def setup_config(config: str | None = None):
     if config:
         p = Path(config).expanduser().resolve()
         os.environ["BMDS_CONFIG"] = str(p)
     setup_logging()
+
+
+def get_app(config: str | None = None) -> BmdsDesktopTui:
+    setup_config(config)
     os.environ["DJANGO_SETTINGS_MODULE"] = "bmds_ui.main.settings.desktop"
     Config.get()
     return BmdsDesktopTui()
@@ -36,12 +41,43 @@ def main():
         help=f'Configuration path (Default: "{get_default_config_path()}")',
         type=str,
     )
+    subparsers = parser.add_subparsers(dest="command")
+    run = subparsers.add_parser(
+        "run", help="Execute analyses and write reports, without starting the application"
+    )
+    run.add_argument(
+        "inputs",
+        nargs="+",
+        type=Path,
+        help="Analysis input JSON files, or folders containing input files",
+    )
+    run.add_argument(
+        "--output", "-o", type=Path, default=Path(), help="Output folder (Default: current folder)"
+    )
+    run.add_argument(
+        "--db",
+        type=Path,
+        help="SQLite database to save analyses to (Default: a temporary database)",
+    )
+    run.add_argument(
+        "--nprocs", "-n", type=int, default=1, help="Number of processes to use (Default: 1)"
+    )
+    run.add_argument("--no-reports", action="store_true", help="Don't write Excel/Word reports")
     args = parser.parse_args()
     if args.version:
         return show_version()
     if args.create_shortcut:
         return create_shortcut()
     try:
+        if args.command == "run":
+            setup_config(args.config)
+            return batch(
+                args.inputs,
+                args.output,
+                db=args.db,
+                nprocs=args.nprocs,
+                reports=not args.no_reports,
+            )
         get_app(config=args.config).run()
     except DesktopException as err:
         sys.stderr.write(str(err) + "\n")
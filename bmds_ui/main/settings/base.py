@@ -211,6 +211,46 @@ WEBPACK_LOADER = {
 
 DAYS_TO_KEEP_ANALYSES = int(os.environ.get("ANALYSIS_RETENTION_DAYS", "365"))
 
+# number of processes used to execute sessions in an analysis; 1 executes sequentially
+ANALYSIS_EXECUTION_NPROCS = int(os.environ.get("ANALYSIS_EXECUTION_NPROCS", "1"))
+# threads used to run analysis and report tasks in the web process when celery tasks are
+# executed eagerly; 0 executes tasks in the calling thread
+BACKGROUND_TASK_WORKERS = int(os.environ.get("BACKGROUND_TASK_WORKERS", "0"))
+# execute each session in an analysis as a separate celery task
+ANALYSIS_EXECUTION_DISTRIBUTED = os.environ.get("ANALYSIS_EXECUTION_DISTRIBUTED", "False") == "True"
+# cache executed session results; a timeout of 0 disables the cache
+ANALYSIS_SESSION_CACHE_TIMEOUT = int(os.environ.get("ANALYSIS_SESSION_CACHE_TIMEOUT", "604800"))
+ANALYSIS_SESSION_CACHE_MAX_SIZE = 5 * 1024 * 1024  # 5 MB
+# total size of cached session results; least recently used results are removed when exceeded
+ANALYSIS_SESSION_CACHE_STORAGE_MAX_SIZE = int(
+    os.environ.get("ANALYSIS_SESSION_CACHE_STORAGE_MAX_SIZE", str(512 * 1024 * 1024))  # 512 MB
+)
+# request Excel and default Word reports when an analysis finishes executing
+ANALYSIS_PREGENERATE_REPORTS = os.environ.get("ANALYSIS_PREGENERATE_REPORTS", "False") == "True"
+# number of processes used to render sessions in a Word report; 1 renders sequentially
+REPORT_DOCX_NPROCS = int(os.environ.get("REPORT_DOCX_NPROCS", "1"))
+# seconds to cache poly-k and Rao-Scott results; a timeout of 0 disables the cache
+TRANSFORM_CACHE_TIMEOUT = int(os.environ.get("TRANSFORM_CACHE_TIMEOUT", "3600"))
+# number of processes used to calculate and export batches of poly-k or Rao-Scott datasets
+TRANSFORM_BATCH_NPROCS = int(os.environ.get("TRANSFORM_BATCH_NPROCS", "1"))
+# seconds to keep generated reports; reports are replaced when analysis content changes
+REPORT_CACHE_TIMEOUT = int(os.environ.get("REPORT_CACHE_TIMEOUT", "604800"))
+# seconds a report lock is held by a queued task; the lock is renewed while the task runs
+REPORT_LOCK_LEASE = int(os.environ.get("REPORT_LOCK_LEASE", "300"))
+# report files are saved to this path; defaults to a reports folder in MEDIA_ROOT
+REPORT_STORAGE_PATH = os.environ.get("REPORT_STORAGE_PATH")
+REPORT_STORAGE_MAX_SIZE = int(
+    os.environ.get("REPORT_STORAGE_MAX_SIZE", str(1024 * 1024 * 1024))  # 1 GB
+)
+# size of the report figure cache, which is saved in a folder in the report storage path; 0 disables
+REPORT_FIGURE_CACHE_MAX_SIZE = int(
+    os.environ.get("REPORT_FIGURE_CACHE_MAX_SIZE", str(256 * 1024 * 1024))  # 256 MB
+)
+# memory budget for deserialized sessions kept in each process; 0 disables
+ANALYSIS_SESSION_LRU_MAX_SIZE = int(
+    os.environ.get("ANALYSIS_SESSION_LRU_MAX_SIZE", str(128 * 1024 * 1024))  # 128 MB
+)
+
 
 # commit information
 def get_git_commit() -> Commit:
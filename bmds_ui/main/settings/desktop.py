@@ -22,6 +22,7 @@ LOGS_PATH.mkdir(exist_ok=True, parents=False)
 
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
+BACKGROUND_TASK_WORKERS = int(os.environ.get("BACKGROUND_TASK_WORKERS", "4"))
 
 CACHES = {
     "default": {
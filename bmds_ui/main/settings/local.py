@@ -0,0 +1,3 @@
+from .dev import *
+
+DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ROOT_DIR / "db.sqlite3"}}
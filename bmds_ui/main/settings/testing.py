@@ -1,3 +1,6 @@
+import tempfile
+from pathlib import Path
+
 from ..constants import AuthProvider
 from .dev import *
 
@@ -10,6 +13,8 @@ LOGGING["loggers"]["bmds_ui.request"]["propagate"] = True
 SKIN = SkinStyle.Base
 DATABASES["default"]["TEST"] = {"NAME": "bmds-ui-test"}
 
+REPORT_STORAGE_PATH = Path(tempfile.gettempdir()) / "bmds-ui-test-reports"
+
 PASSWORD_HASHERS = ("django.contrib.auth.hashers.MD5PasswordHasher",)
 
 AUTH_PROVIDERS = {AuthProvider.django, AuthProvider.external}
@@ -7,7 +7,7 @@ from rest_framework.routers import SimpleRouter
 from rest_framework.schemas import get_schema_view
 
 from ..analysis import schema, views
-from ..analysis.api import AnalysisViewset, PolyKViewset, RaoScottViewset
+from ..analysis.api import AnalysisViewset, CollectionViewset, PolyKViewset, RaoScottViewset
 from ..common import views as common_views
 from ..common.api import HealthcheckViewset
 from .constants import AuthProvider
@@ -18,6 +18,7 @@ healthcheck_url = (
 
 router = SimpleRouter()
 router.register("analysis", AnalysisViewset, basename="analysis")
+router.register("collection", CollectionViewset, basename="collection")
 router.register("polyk", PolyKViewset, basename="polyk")
 router.register("rao-scott", RaoScottViewset, basename="rao-scott")
 router.register(healthcheck_url, HealthcheckViewset, basename="healthcheck")
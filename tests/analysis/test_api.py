@@ -1,4 +1,7 @@
 import json
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
 from io import BytesIO
 
 import docx
@@ -7,7 +10,9 @@ import pytest
 from django.urls import reverse
 from rest_framework.test import APIClient
 
-from bmds_ui.analysis.models import Analysis
+from bmds_ui.analysis import cache as cache_module
+from bmds_ui.analysis.models import Analysis, Collection
+from bmds_ui.analysis.reporting import transforms
 from pybmds.recommender import RecommenderSettings
 
 
@@ -208,6 +213,95 @@ class TestAnalysisViewSet:
         assert response.data["has_errors"] is False
         assert bmd == pytest.approx(164.3, rel=0.05)
 
+    def test_batch(self, complete_dichotomous, complete_continuous):
+        client = APIClient()
+        url = reverse("api:analysis-batch")
+        n_analyses = Analysis.objects.count()
+
+        # staff only
+        payload = {"items": [complete_dichotomous]}
+        response = client.post(url, payload, format="json")
+        assert response.status_code == 403
+        assert Analysis.objects.count() == n_analyses
+        client.login(username="admin@bmdsonline.org", password="pw")
+
+        # invalid; no analyses created
+        invalid = deepcopy(complete_continuous)
+        invalid.pop("datasets")
+        payload = {"items": [complete_dichotomous, invalid]}
+        response = client.post(url, payload, format="json")
+        assert response.status_code == 400
+        assert list(response.json()) == ["1"]
+        assert Analysis.objects.count() == n_analyses
+
+        response = client.post(url, {"items": []}, format="json")
+        assert response.status_code == 400
+
+        # valid; analyses created and executed
+        payload = {"items": [complete_dichotomous, complete_continuous]}
+        response = client.post(url, payload, format="json")
+        assert response.status_code == 201
+        data = response.json()
+        assert len(data) == 2
+        for item, inputs in zip(data, payload["items"], strict=True):
+            analysis = Analysis.objects.get(id=item["id"])
+            assert analysis.password == item["editKey"]
+            assert analysis.inputs == inputs
+            assert analysis.is_finished is True
+            assert analysis.has_errors is False
+            assert analysis.sessions_complete == analysis.sessions_total == 1
+
+    def test_status(self, complete_dichotomous):
+        client = APIClient()
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        url = analysis.get_api_status_url()
+
+        response = client.get(url).json()
+        assert "inputs" not in response and "outputs" not in response
+        assert response["is_executing"] is False
+        assert response["is_finished"] is False
+        assert response["progress"] == {"complete": 0, "total": 0}
+
+        analysis.start_execute()
+        response = client.get(url).json()
+        assert response["is_executing"] is False
+        assert response["is_finished"] is True
+        assert response["has_errors"] is False
+        assert response["progress"] == {"complete": 1, "total": 1}
+
+        # ended without outputs; consistent with the analysis serializer
+        Analysis.objects.filter(id=analysis.id).update(outputs={})
+        response = client.get(url).json()
+        assert response["is_finished"] is False
+        response = client.get(analysis.get_api_url()).json()
+        assert response["is_finished"] is False
+
+    def test_patch_recommender(self, complete_dichotomous):
+        client = APIClient()
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+        url = analysis.get_api_patch_inputs_url()
+        output = analysis.get_outputs()["outputs"][0]["frequentist"]
+        assert output["recommender"]["results"] is not None
+
+        # recommender only changes; outputs are updated without execution
+        data = deepcopy(complete_dichotomous)
+        data["recommender"] = RecommenderSettings.build_default().model_dump()
+        data["recommender"]["enabled"] = False
+        payload = {"editKey": analysis.password, "data": data}
+        response = client.patch(url, payload, format="json").json()
+        assert response["is_finished"] is True
+        output = response["outputs"]["outputs"][0]["frequentist"]
+        assert output["recommender"]["settings"]["enabled"] is False
+        assert output["recommender"]["results"] is None
+        assert response["inputs"]["recommender"] == data["recommender"]
+
+        # other changes reset execution
+        data["options"][0]["bmr_value"] = 0.05
+        response = client.patch(url, payload, format="json").json()
+        assert response["is_finished"] is False
+        assert response["outputs"] == {}
+
     def test_reset_execute(self, complete_dichotomous):
         client = APIClient()
         analysis = Analysis.objects.create(inputs=complete_dichotomous)
@@ -276,6 +370,96 @@ class TestAnalysisViewSet:
         resp = client.get(url)
         assert resp.status_code == 200
 
+    def test_word_edit_url(self):
+        client = APIClient()
+        analysis = Analysis.objects.get(pk=analyses[0])
+        url = reverse("api:analysis-word", args=(analysis.id,))
+
+        # editors receive a separate report with an update link
+        for params in [{}, {"editKey": analysis.password}]:
+            client.get(url, params)
+        view = docx.Document(BytesIO(b"".join(client.get(url).streaming_content)))
+        resp = client.get(url, {"editKey": analysis.password})
+        edit = docx.Document(BytesIO(b"".join(resp.streaming_content)))
+        links = [
+            rel.target_ref for rel in edit.part.rels.values() if rel.reltype.endswith("hyperlink")
+        ]
+        assert any(link.endswith(analysis.get_edit_url()) for link in links)
+        links = [
+            rel.target_ref for rel in view.part.rels.values() if rel.reltype.endswith("hyperlink")
+        ]
+        assert not any(link.endswith(analysis.get_edit_url()) for link in links)
+
+    def test_word_pregenerated(self, settings, complete_dichotomous):
+        settings.ANALYSIS_PREGENERATE_REPORTS = True
+        client = APIClient()
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        payload = {"editKey": analysis.password}
+        client.post(analysis.get_api_execute_url(), payload, format="json")
+
+        # the report an editor downloads is created when execution finishes
+        url = reverse("api:analysis-word", args=(analysis.id,))
+        params = {
+            "editKey": analysis.password,
+            "datasetFormatLong": "true",
+            "allModels": "false",
+            "bmdCdfTable": "false",
+        }
+        resp = client.get(url, params)
+        assert resp.streaming is True
+        assert analysis.get_report_uri() == "http://testserver"
+
+    def test_report_download(self):
+        client = APIClient()
+        analysis = Analysis.objects.get(pk=analyses[0])
+        url = reverse("api:analysis-excel", args=(analysis.id,))
+
+        # reports are streamed from the report store once complete
+        client.get(url)
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp.streaming is True
+        assert resp["Content-Disposition"] == f'attachment; filename="{analysis.slug}.xlsx"'
+        assert b"".join(resp.streaming_content)[:2] == b"PK"
+
+    def test_table(self):
+        client = APIClient()
+        analysis = Analysis.objects.get(pk=analyses[0])
+        url = reverse("api:analysis-table", args=(analysis.id,))
+
+        # csv is streamed
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp.streaming is True
+        assert resp["Content-Disposition"] == f'attachment; filename="{analysis.slug}-summary.csv"'
+        df = pd.read_csv(BytesIO(b"".join(resp.streaming_content)))
+        assert len(df) == len(analysis.to_df()["summary"])
+
+        # subset of columns from a different table
+        resp = client.get(url, {"table": "parameters", "columns": "model_name,name"})
+        df = pd.read_csv(BytesIO(b"".join(resp.streaming_content)))
+        assert df.columns.tolist() == ["model_name", "name"]
+
+        # invalid tables or columns
+        resp = client.get(url, {"table": "foo"})
+        assert resp.status_code == 400
+        assert "Invalid table" in json.loads(resp.content)[0]
+        resp = client.get(url, {"columns": "foo,bar"})
+        assert resp.status_code == 400
+        assert json.loads(resp.content) == ["Invalid columns: foo, bar"]
+
+        # parquet
+        resp = client.get(url, {"format": "parquet"})
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            assert resp.status_code == 400
+            assert json.loads(resp.content) == ["Parquet export requires the pyarrow package"]
+        else:
+            assert resp.status_code == 200
+            df = pd.read_parquet(BytesIO(b"".join(resp.streaming_content)))
+            assert len(df) == len(analysis.to_df()["summary"])
+
     def test_star(self):
         client = APIClient()
         analysis = Analysis.objects.get(pk="cc3ca355-a57a-4fba-9dc3-99657562df68")
@@ -291,6 +475,41 @@ class TestAnalysisViewSet:
         assert resp.status_code == 200
 
 
+@pytest.mark.django_db
+class TestCollectionViewSet:
+    def test_export(self, settings, complete_dichotomous, complete_continuous):
+        client = APIClient()
+        collection = Collection.objects.create(name="Export")
+        analyses = []
+        for inputs in [complete_dichotomous, complete_continuous]:
+            analysis = Analysis.objects.create(inputs=inputs)
+            analysis.execute()
+            analysis.collections.add(collection)
+            analyses.append(analysis)
+        url = reverse("api:collection-export", args=(collection.id,))
+
+        # desktop only
+        resp = client.get(url)
+        assert resp.status_code == 403
+
+        # reports are generated and assembled into one archive
+        settings.IS_DESKTOP = True
+        resp = client.get(url)
+        assert json.loads(resp.content)["status"] == 1
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp["Content-Disposition"] == 'attachment; filename="export.zip"'
+        zf = zipfile.ZipFile(BytesIO(b"".join(resp.streaming_content)))
+        names = zf.namelist()
+        assert len(names) == 5
+        assert names[-1] == "summary.csv"
+        for analysis in analyses:
+            assert f"{analysis.slug}-{str(analysis.id)[:8]}.docx" in names
+            assert f"{analysis.slug}-{str(analysis.id)[:8]}.xlsx" in names
+        df = pd.read_csv(zf.open("summary.csv"))
+        assert set(df.analysis_id) == {str(analysis.id) for analysis in analyses}
+
+
 @pytest.mark.django_db
 class TestPolyKViewSet:
     def test_create(self, polyk_dataset):
@@ -319,6 +538,49 @@ class TestPolyKViewSet:
         doc = docx.Document(BytesIO(response.content))
         assert isinstance(doc, docx.document.Document)
 
+    def test_batch(self, settings, polyk_dataset):
+        client = APIClient()
+        payload = {"items": [polyk_dataset, {**polyk_dataset, "power": 2}]}
+
+        # combined tables
+        response = client.post(reverse("api:polyk-batch"), payload, format="json")
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data["df2"]["index"]) == {0, 1}
+        single = client.post(reverse("api:polyk-list"), polyk_dataset, format="json").json()
+        assert len(data["df"]["index"]) == 2 * len(single["df"]["dose"])
+
+        # datasets are validated together
+        bad = {"items": [polyk_dataset, {**polyk_dataset, "dataset": "a,b\n1,2"}]}
+        response = client.post(reverse("api:polyk-batch"), bad, format="json")
+        assert response.status_code == 400
+        assert json.loads(response.json()[0])[0]["loc"] == ["items", 1, "dataset"]
+
+        # reports for each dataset are returned in a zip, using a worker pool
+        settings.TRANSFORM_BATCH_NPROCS = 2
+        for name, extension in [("batch-excel", "xlsx"), ("batch-word", "docx")]:
+            response = client.post(reverse(f"api:polyk-{name}"), payload, format="json")
+            assert response.status_code == 200
+            zf = zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+            assert zf.namelist() == [f"polyk-adjustment-{i}.{extension}" for i in range(2)]
+
+    def test_batch_pool_failure(self, settings, monkeypatch, polyk_dataset):
+        class FailingPool(ProcessPoolExecutor):
+            def submit(self, *args, **kwargs):
+                raise OSError("cannot start")
+
+        # results and reports are created sequentially if a pool cannot be started
+        monkeypatch.setattr(cache_module, "ProcessPoolExecutor", FailingPool)
+        monkeypatch.setattr(transforms, "ProcessPoolExecutor", FailingPool)
+        settings.TRANSFORM_BATCH_NPROCS = 2
+        settings.TRANSFORM_CACHE_TIMEOUT = 0
+        client = APIClient()
+        payload = {"items": [polyk_dataset, {**polyk_dataset, "power": 2}]}
+        response = client.post(reverse("api:polyk-batch-excel"), payload, format="json")
+        assert response.status_code == 200
+        zf = zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+        assert zf.namelist() == [f"polyk-adjustment-{i}.xlsx" for i in range(2)]
+
 
 @pytest.mark.django_db
 class TestRaoScottViewSet:
@@ -346,3 +608,15 @@ class TestRaoScottViewSet:
         # assert docx loads
         doc = docx.Document(BytesIO(response.content))
         assert isinstance(doc, docx.document.Document)
+
+    def test_batch(self, raoscott_dataset):
+        client = APIClient()
+        payload = {"items": [raoscott_dataset, {**raoscott_dataset, "species": "mouse"}]}
+        response = client.post(reverse("api:rao-scott-batch"), payload, format="json")
+        assert response.status_code == 200
+        assert set(response.json()["df"]["index"]) == {0, 1}
+
+        response = client.post(reverse("api:rao-scott-batch-excel"), payload, format="json")
+        assert response.status_code == 200
+        zf = zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+        assert zf.namelist() == [f"rao-scott-transformation-{i}.xlsx" for i in range(2)]
@@ -0,0 +1,266 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from io import BytesIO
+
+import pytest
+from django.core.cache import cache
+
+from bmds_ui.analysis import schema, tasks, validators
+from bmds_ui.analysis.cache import SessionCache, TransformCache
+from bmds_ui.analysis.models import Analysis, Collection, session_lru
+from bmds_ui.analysis.reporting.cache import (
+    CollectionExportCache,
+    DocxReportCache,
+    ExcelReportCache,
+)
+from bmds_ui.common import background
+from bmds_ui.common.task_cache import ReportFileStore, ReportStatus
+
+
+class TestSessionCache:
+    def test_key(self, complete_dichotomous):
+        data = deepcopy(complete_dichotomous)
+        data["datasets"].append(deepcopy(data["datasets"][0]))
+        data["dataset_options"].append(deepcopy(data["dataset_options"][0]))
+        key = SessionCache(data).key((0, 0))
+
+        # same inputs at a different index have the same key
+        assert SessionCache(data).key((1, 0)) == key
+
+        # any change to inputs used by the session changes the key
+        data["datasets"][1]["ns"][0] = 21
+        assert SessionCache(data).key((1, 0)) != key
+        data["options"][0]["bmr_value"] = 0.05
+        assert SessionCache(data).key((0, 0)) != key
+
+    @pytest.mark.django_db
+    def test_execute(self, settings, tmp_path, complete_dichotomous):
+        settings.ANALYSIS_SESSION_CACHE_TIMEOUT = 60
+        settings.REPORT_STORAGE_PATH = tmp_path
+        cache.clear()
+
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+        assert SessionCache.stats() == {"hits": 0, "misses": 1}
+
+        analysis2 = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis2.execute()
+        assert SessionCache.stats() == {"hits": 1, "misses": 1}
+        analysis.refresh_from_db()
+        analysis2.refresh_from_db()
+        assert json.dumps(analysis2.get_outputs()["outputs"]) == json.dumps(
+            analysis.get_outputs()["outputs"]
+        )
+
+        # disabled cache
+        settings.ANALYSIS_SESSION_CACHE_TIMEOUT = 0
+        analysis2.execute()
+        assert SessionCache.stats() == {"hits": 1, "misses": 1}
+
+    @pytest.mark.django_db
+    def test_store_size(self, settings, tmp_path, complete_dichotomous):
+        settings.REPORT_STORAGE_PATH = tmp_path
+        data = deepcopy(complete_dichotomous)
+        result = Analysis(inputs=data).try_run_session(data, 0, 0)
+        size = len(json.dumps(SessionCache.dump(result)))
+        settings.ANALYSIS_SESSION_CACHE_STORAGE_MAX_SIZE = size + 10
+
+        # least recently used results are removed when the store is full
+        session_cache = SessionCache(data)
+        session_cache.set_many({(0, 0): result})
+        data2 = deepcopy(data)
+        data2["options"][0]["bmr_value"] = 0.05
+        session_cache2 = SessionCache(data2)
+        session_cache2.set_many({(0, 0): result})
+        assert len(list(session_cache.store.root.iterdir())) == 1
+        assert session_cache.get_many([(0, 0)]) == {}
+        assert (0, 0) in session_cache2.get_many([(0, 0)])
+
+        # results unused for the cache timeout are not returned
+        settings.ANALYSIS_SESSION_CACHE_TIMEOUT = 1
+        path = session_cache2.store.path(session_cache2.key((0, 0)))
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime - 10))
+        assert session_cache2.get_many([(0, 0)]) == {}
+        assert not path.exists()
+
+
+class TestTransformCache:
+    def test_calculate(self, settings, monkeypatch, polyk_dataset, raoscott_dataset):
+        cache.clear()
+        calls = []
+        calculate = schema.PolyKInput.calculate
+
+        def mock_calculate(self):
+            calls.append(self)
+            return calculate(self)
+
+        monkeypatch.setattr(schema.PolyKInput, "calculate", mock_calculate)
+
+        # normalized inputs share a result
+        inputs = schema.PolyKInput.model_validate(polyk_dataset)
+        result = TransformCache.calculate(inputs)
+        data = {**polyk_dataset, "dataset": polyk_dataset["dataset"].replace(",", "\t")}
+        inputs2 = schema.PolyKInput.model_validate(data)
+        assert TransformCache.key(inputs2) == TransformCache.key(inputs)
+        result2 = TransformCache.calculate(inputs2)
+        assert len(calls) == 1
+        assert result2.adjusted_data.equals(result.adjusted_data)
+
+        # different inputs and transforms have different keys
+        inputs3 = schema.PolyKInput.model_validate({**polyk_dataset, "power": 2})
+        assert TransformCache.key(inputs3) != TransformCache.key(inputs)
+        inputs4 = schema.RaoScottInput.model_validate(raoscott_dataset)
+        assert TransformCache.key(inputs4) != TransformCache.key(inputs)
+        assert TransformCache.calculate(inputs4).df.equals(inputs4.calculate().df)
+
+        # disabled cache
+        settings.TRANSFORM_CACHE_TIMEOUT = 0
+        TransformCache.calculate(inputs)
+        assert len(calls) == 2
+
+
+@pytest.mark.django_db
+class TestReportCache:
+    def test_keys(self, complete_dichotomous):
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+
+        # report options have different keys
+        report = DocxReportCache(analysis, uri="http://testserver", all_models=False)
+        report2 = DocxReportCache(analysis, uri="http://testserver", all_models=True)
+        assert report.cache_key != report2.cache_key
+
+        # reports are kept until content changes
+        report.create_content()
+        content = report.read().getvalue()
+        analysis.renew()
+        analysis.save()
+        report = DocxReportCache(analysis, uri="http://testserver", all_models=False)
+        assert report.request_content().status is ReportStatus.COMPLETE
+        assert report.read().getvalue() == content
+
+        selection = validators.AnalysisSelectedSchema(
+            dataset_index=0, option_index=0, selected={"model_index": 0, "notes": "notes"}
+        )
+        analysis.update_selection(selection)
+        report2 = DocxReportCache(analysis, uri="http://testserver", all_models=False)
+        assert report2.cache_key != report.cache_key
+        assert report2.request_content().status is ReportStatus.QUEUED
+
+        # reports for previous content are removed when new reports are created
+        assert cache.get(report.cache_key) is None
+        assert report.store.exists(report.cache_key) is False
+        assert cache.get(report2.cache_key).status is ReportStatus.COMPLETE
+        assert report2.store.exists(report2.cache_key) is True
+
+        # reports are recreated if a file is removed
+        report2.store.delete(report2.cache_key)
+        assert report2.request_content().status is ReportStatus.QUEUED
+
+        # a file removed after the status is checked is requested again, and not recreated empty
+        report2.store.delete(report2.cache_key)
+        with pytest.raises(FileNotFoundError):
+            report2.store.open(report2.cache_key)
+        assert report2.file_response("report") is None
+        assert report2.store.exists(report2.cache_key) is False
+        response = report2.request_file("report")
+        assert response.status is ReportStatus.QUEUED
+
+    def test_single_flight(self, monkeypatch, complete_dichotomous):
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+        task_ids = []
+        monkeypatch.setattr(
+            ExcelReportCache, "invoke_celery_task", lambda self, id_: task_ids.append(id_)
+        )
+
+        # requests attach to the running task
+        report = ExcelReportCache(analysis)
+        response = report.request_content()
+        assert response.status is ReportStatus.QUEUED
+        assert response.task_id == task_ids[0]
+        assert ExcelReportCache(analysis).request_content().task_id == task_ids[0]
+        assert len(task_ids) == 1
+
+        # other tasks do not create content while the lock is held
+        assert report.create_content(task_id="other").task_id == task_ids[0]
+        assert report.is_complete() is False
+
+        # the lock is released once content is created
+        assert report.create_content(task_id=task_ids[0]).status is ReportStatus.COMPLETE
+        assert cache.get(report.lock_key) is None
+        assert report.request_content().status is ReportStatus.COMPLETE
+
+        # a new task is started if the lock expires
+        report.store.delete(report.cache_key)
+        report.request_content()
+        cache.delete(report.lock_key)
+        report.request_content()
+        assert len(task_ids) == 3
+
+    def test_serial_create(self, monkeypatch, complete_dichotomous):
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+        running = []
+        overlap = []
+
+        def create(self):
+            overlap.append(len(running))
+            running.append(self)
+            time.sleep(0.05)
+            running.remove(self)
+            return BytesIO(b"report")
+
+        monkeypatch.setattr(ExcelReportCache, "create", create)
+
+        # reports created in different threads are not created concurrently
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for _ in range(3):
+                pool.submit(ExcelReportCache(analysis).create_content)
+        assert overlap == [0, 0, 0]
+
+    def test_collection_export_background(self, monkeypatch, complete_dichotomous):
+        collection = Collection.objects.create(name="Export")
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+        analysis.collections.add(collection)
+        calls = []
+        monkeypatch.setattr(background, "is_enabled", lambda: True)
+        monkeypatch.setattr(
+            tasks.generate_collection_export,
+            "apply_async",
+            lambda *args, **kw: calls.append(kw["task_id"]),
+        )
+
+        # a single background task creates analysis reports and the archive
+        report = CollectionExportCache(collection)
+        response = report.request_content()
+        assert calls == [response.task_id]
+        assert ExcelReportCache(analysis).is_complete() is False
+
+    def test_pregenerate(self, settings, complete_dichotomous):
+        settings.ANALYSIS_PREGENERATE_REPORTS = True
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+
+        # reports are created when execution finishes; tasks are eager, so sessions in memory
+        # are used instead of loading outputs from the database
+        assert session_lru.get(analysis.id, analysis.last_updated) is not None
+        assert ExcelReportCache(analysis).is_complete() is True
+        options = DocxReportCache.default_options(analysis)
+        assert options["edit_url"] is True
+        assert DocxReportCache(analysis, **options).is_complete() is True
+        options.update(all_models=True)
+        assert DocxReportCache(analysis, **options).is_complete() is False
+
+    def test_store_eviction(self, settings, tmp_path):
+        settings.REPORT_STORAGE_PATH = tmp_path
+        settings.REPORT_STORAGE_MAX_SIZE = 10
+        store = ReportFileStore()
+        store.save("a", BytesIO(b"123456"))
+        store.save("b", BytesIO(b"123456"))
+        assert store.exists("a") is False
+        assert store.read("b").getvalue() == b"123456"
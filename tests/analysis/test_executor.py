@@ -1,7 +1,15 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 
-from bmds_ui.analysis.executor import AnalysisSession
-from pybmds.constants import ContinuousModelChoices, DichotomousModelChoices
+from bmds_ui.analysis import executor
+from bmds_ui.analysis.executor import (
+    AnalysisSession,
+    LazySessions,
+    execute_sessions,
+    try_run_session,
+)
+from pybmds.constants import ContinuousModelChoices, DichotomousModelChoices, ModelClass
 from pybmds.types.priors import PriorClass
 
 
@@ -182,3 +190,77 @@ class TestAnalysisSession:
         assert len(session.frequentist.models) == 2
         names = [model.name() for model in session.frequentist.models]
         assert names == ["Exponential 3", "Exponential 5"]
+
+
+def _execute_in_process(queue, data: dict, items: list[tuple]):
+    results = execute_sessions(try_run_session, data, items, nprocs=2)
+    queue.put([result.error for result in results])
+
+
+class TestExecuteSessions:
+    def test_process_pool(self, complete_dichotomous):
+        # add an invalid dataset; a failure shouldn't fail the batch
+        data = deepcopy(complete_dichotomous)
+        data["models"] = {"frequentist_unrestricted": ["Logistic"]}
+        data["datasets"].append({**data["datasets"][0], "doses": [0, 10]})
+        data["dataset_options"].append(data["dataset_options"][0])
+        items = [(0, 0), (1, 0), (0, 0)]
+
+        serial = execute_sessions(try_run_session, data, items, nprocs=1)
+        pooled = execute_sessions(try_run_session, data, items, nprocs=2)
+        for results in [serial, pooled]:
+            assert [(r.dataset_index, r.option_index) for r in results] == items
+            assert [r.error is None for r in results] == [True, False, True]
+        assert pooled[0].frequentist["models"] == serial[0].frequentist["models"]
+
+    def test_daemonic_process(self, complete_dichotomous):
+        # daemonic processes can't start a pool; execute sequentially
+        data = deepcopy(complete_dichotomous)
+        data["models"] = {"frequentist_unrestricted": ["Logistic"]}
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_execute_in_process, args=(queue, data, [(0, 0), (0, 0)]), daemon=True
+        )
+        process.start()
+        errors = queue.get(timeout=60)
+        process.join()
+        assert errors == [None, None]
+
+    def test_pool_start_failure(self, monkeypatch, complete_dichotomous):
+        class FailingPool(ProcessPoolExecutor):
+            def submit(self, *args, **kwargs):
+                raise OSError("cannot start")
+
+        monkeypatch.setattr(executor, "ProcessPoolExecutor", FailingPool)
+        data = deepcopy(complete_dichotomous)
+        data["models"] = {"frequentist_unrestricted": ["Logistic"]}
+        completed = []
+        results = execute_sessions(
+            try_run_session,
+            data,
+            [(0, 0), (0, 0)],
+            nprocs=2,
+            callback=lambda item, result: completed.append(item),
+        )
+        assert [result.error for result in results] == [None, None]
+        assert completed == [(0, 0), (0, 0)]
+
+
+class TestLazySessions:
+    def test_lazy(self, complete_dichotomous):
+        data = deepcopy(complete_dichotomous)
+        data["options"].append(data["options"][0])
+        outputs = [try_run_session(data, 0, i).model_dump(by_alias=True) for i in range(2)]
+
+        sessions = LazySessions(ModelClass.DICHOTOMOUS, outputs)
+        assert len(sessions) == 2
+        assert sessions._sessions == {}
+        assert sessions[-1].option_index == 1
+        assert list(sessions._sessions) == [1]
+        assert sessions[1] is sessions[1]
+        assert [session.option_index for session in sessions] == [0, 1]
+
+        # streamed sessions are not retained
+        sessions = LazySessions(ModelClass.DICHOTOMOUS, outputs, retain=False)
+        assert [session.option_index for session in sessions] == [0, 1]
+        assert sessions._sessions == {}
@@ -1,13 +1,21 @@
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from io import BytesIO
 from pathlib import Path
 
+import docx
 import pandas as pd
 import pytest
 
-from bmds_ui.analysis.models import Analysis
+import pybmds
+from bmds_ui.analysis import executor, validators
+from bmds_ui.analysis.models import Analysis, AnalysisSessionResult, session_lru
+from bmds_ui.analysis.reporting import docx as docx_report
 from bmds_ui.analysis.reporting.docx import build_docx
+from pybmds.recommender import RecommenderSettings
 
 
-def write_excel(data: dict, path: Path):
+def write_excel(data: dict, path: Path | BytesIO):
     with pd.ExcelWriter(path) as writer:
         for name, df in data.items():
             df.to_excel(writer, sheet_name=name, index=False)
@@ -51,11 +59,12 @@ class TestExecution:
 
         assert analysis.is_finished is True
         assert analysis.has_errors is False
-        assert analysis.outputs["outputs"][0]["dataset_index"] == 0
-        assert analysis.outputs["outputs"][0]["option_index"] == 0
-        assert len(analysis.outputs["outputs"]) == 1
-        assert len(analysis.outputs["outputs"][0]["frequentist"]["models"]) == 1
-        assert len(analysis.outputs["outputs"][0]["bayesian"]["models"]) == 1
+        outputs = analysis.get_outputs()["outputs"]
+        assert outputs[0]["dataset_index"] == 0
+        assert outputs[0]["option_index"] == 0
+        assert len(outputs) == 1
+        assert len(outputs[0]["frequentist"]["models"]) == 1
+        assert len(outputs[0]["bayesian"]["models"]) == 1
         assert analysis.errors == []
 
         # test reporting (for completion)
@@ -79,11 +88,12 @@ class TestExecution:
 
         assert analysis.is_finished is True
         assert analysis.has_errors is False
-        assert analysis.outputs["outputs"][0]["dataset_index"] == 0
-        assert analysis.outputs["outputs"][0]["option_index"] == 0
-        assert len(analysis.outputs["outputs"]) == 1
-        assert len(analysis.outputs["outputs"][0]["frequentist"]["models"]) == 1
-        assert len(analysis.outputs["outputs"][0]["bayesian"]["models"]) == 1
+        outputs = analysis.get_outputs()["outputs"]
+        assert outputs[0]["dataset_index"] == 0
+        assert outputs[0]["option_index"] == 0
+        assert len(outputs) == 1
+        assert len(outputs[0]["frequentist"]["models"]) == 1
+        assert len(outputs[0]["bayesian"]["models"]) == 1
         assert analysis.errors == []
 
         # test reporting (for completion)
@@ -105,11 +115,12 @@ class TestExecution:
 
         assert analysis.is_finished is True
         assert analysis.has_errors is False
-        assert analysis.outputs["outputs"][0]["dataset_index"] == 0
-        assert analysis.outputs["outputs"][0]["option_index"] == 0
-        assert len(analysis.outputs["outputs"]) == 1
-        assert len(analysis.outputs["outputs"][0]["frequentist"]["models"]) == 1
-        assert len(analysis.outputs["outputs"][0]["bayesian"]["models"]) == 1
+        outputs = analysis.get_outputs()["outputs"]
+        assert outputs[0]["dataset_index"] == 0
+        assert outputs[0]["option_index"] == 0
+        assert len(outputs) == 1
+        assert len(outputs[0]["frequentist"]["models"]) == 1
+        assert len(outputs[0]["bayesian"]["models"]) == 1
         assert analysis.errors == []
 
         # test reporting (for completion)
@@ -131,11 +142,12 @@ class TestExecution:
 
         assert analysis.is_finished is True
         assert analysis.has_errors is False
-        assert analysis.outputs["outputs"][0]["dataset_index"] == 0
-        assert analysis.outputs["outputs"][0]["option_index"] == 0
-        assert len(analysis.outputs["outputs"]) == 1
-        assert len(analysis.outputs["outputs"][0]["frequentist"]["models"]) == 4
-        assert analysis.outputs["outputs"][0]["bayesian"] is None
+        outputs = analysis.get_outputs()["outputs"]
+        assert outputs[0]["dataset_index"] == 0
+        assert outputs[0]["option_index"] == 0
+        assert len(outputs) == 1
+        assert len(outputs[0]["frequentist"]["models"]) == 4
+        assert outputs[0]["bayesian"] is None
         assert analysis.errors == []
 
         # test reporting (for completion)
@@ -157,11 +169,12 @@ class TestExecution:
 
         assert analysis.is_finished is True
         assert analysis.has_errors is False
-        assert len(analysis.outputs["outputs"]) == 1
-        assert len(analysis.outputs["outputs"][0]["frequentist"]["results"]["models"]) == 3
-        assert len(analysis.outputs["outputs"][0]["frequentist"]["results"]["models"][0]) == 1
-        assert len(analysis.outputs["outputs"][0]["frequentist"]["results"]["models"][1]) == 4
-        assert analysis.outputs["outputs"][0]["bayesian"] is None
+        outputs = analysis.get_outputs()["outputs"]
+        assert len(outputs) == 1
+        assert len(outputs[0]["frequentist"]["results"]["models"]) == 3
+        assert len(outputs[0]["frequentist"]["results"]["models"][0]) == 1
+        assert len(outputs[0]["frequentist"]["results"]["models"][1]) == 4
+        assert outputs[0]["bayesian"] is None
         assert analysis.errors == []
 
         # test reporting (for completion)
@@ -172,3 +185,254 @@ class TestExecution:
         if rewrite_data_files:
             write_excel(df, data_path / "reports/multitumor.xlsx")
             (data_path / "reports/multitumor.docx").write_bytes(docx.getvalue())
+
+    def test_distributed(self, settings, complete_dichotomous):
+        settings.ANALYSIS_EXECUTION_DISTRIBUTED = True
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.start_execute()
+
+        analysis.refresh_from_db()
+        assert analysis.is_finished is True
+        assert analysis.has_errors is False
+        outputs = analysis.get_outputs()["outputs"]
+        assert len(outputs) == 1
+        assert len(outputs[0]["frequentist"]["models"]) == 1
+
+    def test_progress(self, settings, monkeypatch, complete_dichotomous):
+        settings.ANALYSIS_SESSION_CACHE_TIMEOUT = 0
+        complete_dichotomous["options"].append(complete_dichotomous["options"][0])
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+
+        # session results and progress are saved as each session completes
+        saved = []
+        original = Analysis._save_session_result
+
+        def save_session_result(self, output):
+            original(self, output)
+            results = AnalysisSessionResult.objects.filter(analysis_id=self.id)
+            saved.append(list(results.values_list("option_index", flat=True)))
+
+        monkeypatch.setattr(Analysis, "_save_session_result", save_session_result)
+        analysis.execute()
+        assert saved == [[0], [0, 1]]
+        assert analysis.progress == {"complete": 2, "total": 2}
+        assert analysis.session_results.count() == 2
+
+        analysis.reset_execution()
+        assert analysis.progress == {"complete": 0, "total": 0}
+        assert analysis.session_results.count() == 0
+
+    def test_update_selection(self, complete_dichotomous):
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+        last_updated = analysis.last_updated
+
+        selection = validators.AnalysisSelectedSchema(
+            dataset_index=0, option_index=0, selected={"model_index": 0, "notes": "notes"}
+        )
+        analysis.update_selection(selection)
+        assert analysis.last_updated > last_updated
+        session = analysis.get_session(0, 0)
+        assert session.frequentist.selected.model_index == 0
+        assert session.frequentist.selected.notes == "notes"
+
+    def test_session_lru(self, settings, tmp_path, complete_dichotomous):
+        settings.REPORT_STORAGE_PATH = tmp_path
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+
+        # sessions are reused until the analysis changes
+        sessions = analysis.get_sessions()
+        assert analysis.get_sessions() is sessions
+        assert analysis.get_session(0, 0) is sessions[0]
+        assert analysis.get_sessions(copy=True) is not sessions
+        selection = validators.AnalysisSelectedSchema(
+            dataset_index=0, option_index=0, selected={"model_index": 0, "notes": "notes"}
+        )
+        analysis.update_selection(selection)
+        assert analysis.get_sessions() is not sessions
+
+        # reports read from and fill the cache
+        session_lru.clear()
+        analysis.to_excel()
+        sessions = session_lru.get(analysis.id, analysis.last_updated)
+        assert sessions is not None
+        build_docx(analysis, "http://bmds-python.com")
+        assert session_lru.get(analysis.id, analysis.last_updated) is sessions
+
+        # figures are cached using session views; shared sessions are not modified
+        session = sessions[0].frequentist
+        assert "plot" not in vars(session)
+        assert not any("plot" in vars(model) for model in session.models)
+        assert session.selected.session is session
+
+        session_lru.clear()
+
+        # sessions which exceed the memory budget are not cached
+        settings.ANALYSIS_SESSION_LRU_MAX_SIZE = 100
+        sessions = analysis.get_sessions()
+        assert analysis.get_sessions() is not sessions
+
+    @pytest.mark.parametrize(
+        "fixture", ["complete_continuous", "complete_dichotomous", "bmds_complete_nd"]
+    )
+    def test_streaming_excel(self, request, fixture):
+        analysis = Analysis.objects.create(inputs=request.getfixturevalue(fixture))
+        analysis.execute()
+
+        # streamed workbook is equivalent to a workbook written from dataframes
+        expected = BytesIO()
+        write_excel(analysis.to_df(), expected)
+        expected = pd.read_excel(expected, sheet_name=None)
+        actual = pd.read_excel(analysis.to_excel(), sheet_name=None)
+        assert list(actual) == list(expected)
+        for name, df in expected.items():
+            pd.testing.assert_frame_equal(actual[name], df)
+
+    def test_parallel_docx(self, settings, complete_dichotomous):
+        complete_dichotomous["options"].append(complete_dichotomous["options"][0])
+        complete_dichotomous["models"]["bayesian"] = [
+            {"model": "Logistic", "prior_weight": 1},
+        ]
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+
+        def summarize(f: BytesIO) -> tuple:
+            document = docx.Document(f)
+            paragraphs = [
+                (p.style.name, p.text)
+                for p in document.paragraphs
+                if not p.text.startswith("Report Generated")
+            ]
+            return paragraphs, len(document.tables), len(document.inline_shapes)
+
+        # sessions rendered in parallel are merged into an equivalent report
+        settings.REPORT_DOCX_NPROCS = 1
+        expected = summarize(build_docx(analysis, "http://bmds-python.com"))
+        settings.REPORT_DOCX_NPROCS = 2
+        actual = summarize(build_docx(analysis, "http://bmds-python.com"))
+        assert actual == expected
+        assert expected[2] == 4
+
+    def test_parallel_docx_fallback(self, settings, monkeypatch, complete_dichotomous):
+        complete_dichotomous["options"].append(complete_dichotomous["options"][0])
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+        settings.REPORT_DOCX_NPROCS = 2
+
+        class FailingPool(ProcessPoolExecutor):
+            def submit(self, *args, **kwargs):
+                raise OSError("cannot start")
+
+        # sessions are written sequentially if a pool cannot be started
+        monkeypatch.setattr(docx_report, "ProcessPoolExecutor", FailingPool)
+        document = docx.Document(build_docx(analysis, "http://bmds-python.com"))
+        assert len(document.inline_shapes) == 4
+
+        # daemonic processes don't attempt to start a pool
+        monkeypatch.setattr(docx_report, "ProcessPoolExecutor", None)
+        monkeypatch.setattr(docx_report, "can_start_processes", lambda: False)
+        document = docx.Document(build_docx(analysis, "http://bmds-python.com"))
+        assert len(document.inline_shapes) == 4
+
+    def test_figure_cache(self, settings, monkeypatch, tmp_path, complete_dichotomous):
+        settings.REPORT_STORAGE_PATH = tmp_path
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+
+        plots = []
+        plot = pybmds.Session.plot
+
+        def mock_plot(self, *args, **kwargs):
+            plots.append(args)
+            return plot(self, *args, **kwargs)
+
+        monkeypatch.setattr(pybmds.Session, "plot", mock_plot)
+        build_docx(analysis, "http://bmds-python.com")
+        assert len(plots) == 2  # frequentist and bayesian
+        assert len(list((tmp_path / "figures").iterdir())) == 2
+
+        # figures are reused with different report options
+        build_docx(analysis, "http://bmds-python.com", dataset_format_long=False)
+        assert len(plots) == 2
+
+        # disabled cache
+        settings.REPORT_FIGURE_CACHE_MAX_SIZE = 0
+        build_docx(analysis, "http://bmds-python.com")
+        assert len(plots) == 4
+
+        # the selected model's figures are cached using the session view
+        settings.REPORT_FIGURE_CACHE_MAX_SIZE = 10 * 1024 * 1024
+        selection = validators.AnalysisSelectedSchema(
+            dataset_index=0, option_index=0, selected={"model_index": 0, "notes": "notes"}
+        )
+        analysis.update_selection(selection)
+        model_plots = []
+        model_plot = pybmds.models.base.BmdModel.plot
+
+        def mock_model_plot(self, *args, **kwargs):
+            model_plots.append(args)
+            return model_plot(self, *args, **kwargs)
+
+        monkeypatch.setattr(pybmds.models.base.BmdModel, "plot", mock_model_plot)
+        build_docx(analysis, "http://bmds-python.com")
+        assert len(model_plots) == 1
+        build_docx(analysis, "http://bmds-python.com")
+        assert len(model_plots) == 1
+
+    def test_incremental(self, settings, monkeypatch, complete_dichotomous):
+        settings.ANALYSIS_SESSION_CACHE_TIMEOUT = 0
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+
+        # add a dataset; only the new dataset is stale
+        analysis.reset_execution(keep_outputs=True)
+        assert analysis.session_results.filter(stale=True).count() == 1
+        inputs = deepcopy(analysis.inputs)
+        inputs["datasets"].append({**inputs["datasets"][0], "incidences": [0, 1, 2, 5, 12]})
+        inputs["dataset_options"].append(inputs["dataset_options"][0])
+        analysis.inputs = inputs
+        assert analysis.stale_sessions() == [(1, 0)]
+
+        executed = []
+        execute_sessions = executor.execute_sessions
+
+        def mock_execute_sessions(runner, inputs, items, nprocs=1, callback=None):
+            executed.extend(items)
+            return execute_sessions(runner, inputs, items, nprocs, callback)
+
+        monkeypatch.setattr(executor, "execute_sessions", mock_execute_sessions)
+        analysis.execute()
+        assert executed == [(1, 0)]
+        assert analysis.has_errors is False
+        assert [output["dataset_index"] for output in analysis.get_outputs()["outputs"]] == [0, 1]
+        assert analysis.session_results.filter(stale=True).count() == 0
+
+        # without keeping outputs, all sessions are stale
+        analysis.reset_execution()
+        assert analysis.stale_sessions() == [(0, 0), (1, 0)]
+
+    def test_incremental_recommender(self, settings, monkeypatch, complete_dichotomous):
+        settings.ANALYSIS_SESSION_CACHE_TIMEOUT = 0
+        analysis = Analysis.objects.create(inputs=complete_dichotomous)
+        analysis.execute()
+
+        # sessions are reused after a recommender change
+        recommender = RecommenderSettings.build_default().model_dump()
+        recommender["enabled"] = False
+        analysis.update_recommender(recommender)
+        analysis.save()
+        analysis.reset_execution(keep_outputs=True)
+        assert analysis.stale_sessions() == []
+
+        executed = []
+        monkeypatch.setattr(
+            executor,
+            "execute_sessions",
+            lambda runner, inputs, items, nprocs=1, callback=None: executed.extend(items) or [],
+        )
+        analysis.execute()
+        assert executed == []
+        assert analysis.has_errors is False
+        output = analysis.get_outputs()["outputs"][0]["frequentist"]
+        assert output["recommender"]["settings"]["enabled"] is False
@@ -104,6 +104,7 @@ class TestAnalysisClone:
         analysis2 = response.context["object"]
         assert str(analysis.id) != str(analysis2.id)
         assert analysis2.inputs["analysis_name"] == f"{analysis.inputs['analysis_name']} (clone)"
+        assert analysis2.get_outputs()["outputs"] == analysis.get_outputs()["outputs"]
 
 
 @pytest.mark.django_db
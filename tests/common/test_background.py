@@ -0,0 +1,41 @@
+import threading
+
+from celery import shared_task
+
+from bmds_ui.common.background import BackgroundTask
+
+started = threading.Event()
+release = threading.Event()
+results: list[str] = []
+
+
+@shared_task(base=BackgroundTask, bind=True)
+def wait_task(self, value: str):
+    started.set()
+    release.wait(timeout=10)
+    results.append(f"{value}-{self.request.id}-{threading.current_thread().name}")
+
+
+def test_background_task(settings):
+    results.clear()
+
+    # executed in the calling thread
+    settings.BACKGROUND_TASK_WORKERS = 0
+    release.set()
+    wait_task.delay("a")
+    assert results[0].endswith(threading.current_thread().name)
+
+    # executed in a background thread; the caller doesn't wait
+    settings.BACKGROUND_TASK_WORKERS = 2
+    started.clear()
+    release.clear()
+    result = wait_task.apply_async(("b",), task_id="abc")
+    assert result.id == "abc"
+    assert started.wait(timeout=10)
+    assert len(results) == 1
+    release.set()
+    for _ in range(100):
+        if len(results) == 2:
+            break
+        threading.Event().wait(0.1)
+    assert results[1].startswith("b-abc-background")
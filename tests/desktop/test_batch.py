@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from bmds_ui.analysis.models import Analysis
+from bmds_ui.desktop import batch
+from bmds_ui.desktop.exceptions import DesktopException
+
+
+def test_find_input_files(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "b.json").write_text("{}")
+    (tmp_path / "c.txt").write_text("")
+    files = batch.find_input_files([tmp_path, tmp_path / "a.json"])
+    assert [file.name for file in files] == ["a.json", "b.json", "a.json"]
+
+    with pytest.raises(DesktopException, match="Input not found"):
+        batch.find_input_files([tmp_path / "missing.json"])
+
+
+def test_output_names(tmp_path):
+    # duplicate names don't use the name of another input
+    files = [tmp_path / "a.json", tmp_path / "x" / "a.json", tmp_path / "a-2.json"]
+    assert batch._output_names(files) == ["a", "a-3", "a-2"]
+    files = [tmp_path / "a.json", tmp_path / "x" / "a.json", tmp_path / "y" / "a.json"]
+    assert batch._output_names(files) == ["a", "a-2", "a-3"]
+
+
+@pytest.mark.django_db
+def test_run_batch(tmp_path, complete_dichotomous, complete_continuous):
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "d.json").write_text(json.dumps(complete_dichotomous))
+    (inputs / "c.json").write_text(json.dumps(complete_continuous))
+    files = batch.find_input_files([inputs])
+    output = tmp_path / "outputs"
+
+    analyses = batch.run_batch(files, output, nprocs=2)
+    assert len(analyses) == 2
+    for analysis in analyses:
+        analysis = Analysis.objects.get(id=analysis.id)
+        assert analysis.is_finished is True
+        assert analysis.has_errors is False
+    assert sorted(path.name for path in output.iterdir()) == [
+        "c.docx",
+        "c.json",
+        "c.xlsx",
+        "d.docx",
+        "d.json",
+        "d.xlsx",
+    ]
+    data = json.loads((output / "d.json").read_text())
+    assert data["inputs"] == complete_dichotomous
+    assert len(data["outputs"]["outputs"]) == 1
+
+    # invalid inputs; no analyses created
+    n_analyses = Analysis.objects.count()
+    (inputs / "invalid.json").write_text(json.dumps({"dataset_type": "C"}))
+    with pytest.raises(DesktopException, match="Invalid inputs"):
+        batch.run_batch(batch.find_input_files([inputs]), output, reports=False)
+    assert Analysis.objects.count() == n_analyses